@@ -0,0 +1,70 @@
+"""Add pg_notify triggers for live changes
+
+Revision ID: b7d4e19a3c65
+Revises: a62c0e4f8d17
+Create Date: 2026-10-17 18:05:12.637204
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d4e19a3c65"
+down_revision: str | Sequence[str] | None = "a62c0e4f8d17"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (table, trigger timing and events, level, columns sent in the payload)
+TRIGGERS = [
+    ("active_activities", "INSERT OR UPDATE OR DELETE", "ROW", ["user_id", "activity_id", "start_time"]),
+    ("reactions", "INSERT", "ROW", ["room_id", "sender_id", "receiver_id", "emoji"]),
+    ("users", "UPDATE OR DELETE", "ROW", ["id"]),
+    ("room_members", "INSERT OR DELETE", "ROW", ["room_id", "user_id"]),
+    ("rooms", "UPDATE OF admin_id OR DELETE", "ROW", ["id"]),
+    ("outbox", "INSERT", "STATEMENT", []),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # payloads carry only the listed columns: NOTIFY payloads are limited to 8000 bytes
+    # and every listener sees them, so rows like users must not be sent whole
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_change() RETURNS trigger AS $$
+        DECLARE
+            payload jsonb := jsonb_build_object('table', TG_TABLE_NAME, 'op', TG_OP);
+            rec jsonb;
+            column_name text;
+        BEGIN
+            IF TG_LEVEL = 'ROW' THEN
+                IF TG_OP = 'DELETE' THEN
+                    rec := to_jsonb(OLD);
+                ELSE
+                    rec := to_jsonb(NEW);
+                END IF;
+                FOREACH column_name IN ARRAY TG_ARGV LOOP
+                    payload := payload || jsonb_build_object(column_name, rec -> column_name);
+                END LOOP;
+            END IF;
+            PERFORM pg_notify('grindex_changes', payload::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table, events, level, columns in TRIGGERS:
+        arguments = ", ".join(f"'{column}'" for column in columns)
+        op.execute(
+            f"CREATE TRIGGER {table}_notify_change AFTER {events} ON {table} "
+            f"FOR EACH {level} EXECUTE FUNCTION notify_change({arguments})"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _, _, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_change ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_change()")
@@ -0,0 +1,49 @@
+"""Add activity_daily_totals rollup
+
+Revision ID: c41e9a7b2d53
+Revises: 5a8993416980
+Create Date: 2026-10-17 10:12:41.208315
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41e9a7b2d53"
+down_revision: str | Sequence[str] | None = "5a8993416980"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "activity_daily_totals",
+        sa.Column("activity_id", sa.UUID(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("minutes", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["activity_id"],
+            ["activities.id"],
+        ),
+        sa.PrimaryKeyConstraint("activity_id", "day"),
+    )
+
+    # backfill from the existing raw logs
+    op.execute(
+        """
+        INSERT INTO activity_daily_totals (activity_id, day, minutes)
+        SELECT activity_id, timestamp, SUM(duration_minutes)
+        FROM activity_logs
+        GROUP BY activity_id, timestamp
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("activity_daily_totals")
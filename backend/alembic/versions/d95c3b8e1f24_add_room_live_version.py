@@ -0,0 +1,29 @@
+"""Add rooms.live_version
+
+Revision ID: d95c3b8e1f24
+Revises: b7d4e19a3c65
+Create Date: 2026-10-17 19:22:41.508316
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d95c3b8e1f24"
+down_revision: str | Sequence[str] | None = "b7d4e19a3c65"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("rooms", sa.Column("live_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("rooms", "live_version")
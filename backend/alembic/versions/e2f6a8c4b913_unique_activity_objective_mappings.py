@@ -0,0 +1,57 @@
+"""Make activity objective mappings unique
+
+Revision ID: e2f6a8c4b913
+Revises: d95c3b8e1f24
+Create Date: 2026-10-17 20:04:18.937465
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2f6a8c4b913"
+down_revision: str | Sequence[str] | None = "d95c3b8e1f24"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+DUPLICATES = """
+    FROM activity_objective_mappings newer
+    WHERE newer.room_id = m.room_id
+      AND newer.user_id = m.user_id
+      AND newer.activity_id = m.activity_id
+      AND newer.objective_id = m.objective_id
+      AND (newer.created_at, newer.id) > (m.created_at, m.id)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # duplicates counted twice in the cached leaderboards: rebuild those rooms on their next read
+    op.execute(
+        f"""
+        UPDATE rooms SET leaderboard_ready = false
+        WHERE id IN (SELECT m.room_id FROM activity_objective_mappings m WHERE EXISTS (SELECT 1 {DUPLICATES}))
+        """
+    )
+    # keep the latest weight of every duplicated mapping
+    op.execute(f"DELETE FROM activity_objective_mappings m WHERE EXISTS (SELECT 1 {DUPLICATES})")
+
+    # the unique index also serves the (room_id, user_id) lookups
+    op.create_unique_constraint(
+        "uq_activity_objective_mappings_room_user_activity_objective",
+        "activity_objective_mappings",
+        ["room_id", "user_id", "activity_id", "objective_id"],
+    )
+    op.drop_index("ix_activity_objective_mappings_room_id_user_id", table_name="activity_objective_mappings")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "ix_activity_objective_mappings_room_id_user_id", "activity_objective_mappings", ["room_id", "user_id"]
+    )
+    op.drop_constraint(
+        "uq_activity_objective_mappings_room_user_activity_objective", "activity_objective_mappings", type_="unique"
+    )
@@ -0,0 +1,52 @@
+"""Add leaderboard_entries cache
+
+Revision ID: e8b15f0c6a92
+Revises: c41e9a7b2d53
+Create Date: 2026-10-17 13:40:05.771902
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b15f0c6a92"
+down_revision: str | Sequence[str] | None = "c41e9a7b2d53"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "leaderboard_entries",
+        sa.Column("room_id", sa.UUID(), nullable=False),
+        sa.Column("objective_id", sa.UUID(), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("minutes", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["objective_id"],
+            ["objectives.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["room_id"],
+            ["rooms.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("room_id", "objective_id", "period_start", "user_id"),
+    )
+    # existing rooms start cold and get their entries rebuilt on the first leaderboard read
+    op.add_column("rooms", sa.Column("leaderboard_ready", sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("rooms", "leaderboard_ready")
+    op.drop_table("leaderboard_entries")
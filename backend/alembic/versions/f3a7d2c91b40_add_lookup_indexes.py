@@ -0,0 +1,46 @@
+"""Add indexes for hot lookups
+
+Revision ID: f3a7d2c91b40
+Revises: e8b15f0c6a92
+Create Date: 2026-10-17 15:02:18.443610
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a7d2c91b40"
+down_revision: str | Sequence[str] | None = "e8b15f0c6a92"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+INDEXES = [
+    ("ix_activity_logs_activity_id_timestamp", "activity_logs", ["activity_id", "timestamp"]),
+    ("ix_activity_objective_mappings_room_id_user_id", "activity_objective_mappings", ["room_id", "user_id"]),
+    ("ix_activity_objective_mappings_user_id_activity_id", "activity_objective_mappings", ["user_id", "activity_id"]),
+    ("ix_activity_objective_mappings_activity_id", "activity_objective_mappings", ["activity_id"]),
+    ("ix_room_members_user_id", "room_members", ["user_id"]),
+    ("ix_reactions_room_id_receiver_id_emoji", "reactions", ["room_id", "receiver_id", "emoji"]),
+    ("ix_activities_user_id", "activities", ["user_id"]),
+    ("ix_objectives_room_id", "objectives", ["room_id"]),
+    ("ix_objective_groups_room_id", "objective_groups", ["room_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction, but it does not block writes on a live database.
+    # if_not_exists makes a rerun after an interrupted build skip the indexes that are already there
+    # (an interrupted concurrent build leaves an INVALID index behind that has to be dropped by hand)
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -1,16 +1,36 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.dependencies.auth import verify_metrics_token
 from app.api.route.auth import endpoints as auth_endpoints
 from app.api.route.v1 import activities as activities_endpoints
 from app.api.route.v1 import live_status as live_status_endpoints
 from app.api.route.v1 import rooms as rooms_endpoints
 from app.api.route.v1 import users as users_endpoints
 from app.core.config import settings
+from app.core.metrics import collect
+from app.database.pubsub import change_listener
+from app.services.live_status_dispatcher import live_status_dispatcher
+from app.services.notification_service import close_ws_client, get_ws_client
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    get_ws_client()
+    change_listener.start()
+    live_status_dispatcher.start()
+    yield
+    await live_status_dispatcher.stop()
+    await change_listener.stop()
+    await close_ws_client()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 if settings.BACKEND_CORS_ORIGINS:
@@ -40,3 +60,8 @@ app.include_router(live_status_endpoints.router, prefix=f"{settings.API_V1_STR}/
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", dependencies=[Depends(verify_metrics_token)], include_in_schema=False)
+def metrics():
+    return collect()
@@ -1,3 +1,4 @@
+import secrets
 from typing import Annotated
 from uuid import UUID
 
@@ -6,24 +7,71 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.api.schema.auth import TokenPayload
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import register_collector
 from app.core.security import ALGORITHM
+from app.database.pubsub import change_listener
 from app.database.session import get_db
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
+
+# column values of recently authenticated users, keyed by user id
+principal_cache = TTLCache(ttl=settings.PRINCIPAL_CACHE_TTL, maxsize=settings.PRINCIPAL_CACHE_SIZE)
+register_collector("principal_cache", principal_cache.stats)
+
+_PRINCIPAL_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+def invalidate_principal(user_id: UUID) -> None:
+    """Drop a cached user after changing it. Other workers drop it on the change notification."""
+    principal_cache.invalidate(user_id)
+
+
+def _on_user_change(change: dict) -> None:
+    if change["op"] == "RESET":
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate(UUID(change["id"]))
+
+
+change_listener.subscribe("users", _on_user_change)
+
+
+async def _load_principal(session: AsyncSession, user_id: UUID) -> User | None:
+    values = principal_cache.get(user_id)
+    if values is not None:
+        # attach a copy to the session without querying, as if it had just been loaded
+        user = User(**values)
+        make_transient_to_detached(user)
+        return await session.merge(user, load=False)
+
+    result = await session.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is not None:
+        principal_cache.set(user_id, {key: getattr(user, key) for key in _PRINCIPAL_COLUMNS})
+    return user
 
 
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)], session: Annotated[AsyncSession, Depends(get_db)]
 ) -> User:
+    return await authenticate_token(session, token)
+
+
+async def authenticate_token(session: AsyncSession, token: str | None) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if not token:
+        raise credentials_exception
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
@@ -35,9 +83,20 @@ async def get_current_user(
         print(f"JWTError: {e}")
         raise credentials_exception from e
 
-    result = await session.execute(select(User).where(User.id == UUID(token_data.sub)))
-    user = result.scalar_one_or_none()
+    user = await _load_principal(session, UUID(token_data.sub))
     if user is None:
         print("User not found")
         raise credentials_exception
     return user
+
+
+def verify_metrics_token(token: Annotated[str | None, Depends(optional_oauth2_scheme)]) -> None:
+    """Guards ``/metrics``, which exposes pool, cache and relay internals."""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not token or not secrets.compare_digest(token, settings.METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -1,14 +1,18 @@
+import json
 from datetime import date
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import Receive, Scope, Send
 
 from app.api.dependencies.auth import get_current_user
 from app.api.schema.activity import (
     ActiveActivityResponse,
     ActivityCreate,
+    ActivityLogBatchCreate,
     ActivityLogCreate,
     ActivityLogResponse,
     ActivityResponse,
@@ -17,8 +21,9 @@ from app.api.schema.activity import (
 )
 from app.database.session import get_db
 from app.models.user import User
-from app.services.activity_log_service import get_activity_logs, log_activity
+from app.services.activity_log_service import get_activity_logs, log_activities, log_activity
 from app.services.activity_service import create_activity, get_activities, get_activity, update_activity
+from app.services.import_service import ImportFormat, import_activity_logs, iter_lines
 from app.services.tracker_service import get_active_activity, start_activity, stop_activity, switch_activity
 
 router = APIRouter()
@@ -101,6 +106,15 @@ async def create_activity_log(
     return await log_activity(session, activity_id, log_in, current_user.id)
 
 
+@router.post("/logs/batch", response_model=list[ActivityLogResponse])
+async def create_activity_logs(
+    logs_in: ActivityLogBatchCreate,
+    current_user: Annotated[User, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_db)],
+):
+    return await log_activities(session, logs_in.logs, current_user.id)
+
+
 @router.get("/{activity_id}/logs", response_model=list[ActivityLogResponse])
 async def read_activity_logs(
     activity_id: UUID,
@@ -112,6 +126,42 @@ async def read_activity_logs(
     return await get_activity_logs(session, activity_id, current_user.id, start_date, end_date)
 
 
+class ImportProgressResponse(StreamingResponse):
+    """Streams while the request body is still being read.
+
+    Starlette would otherwise listen for a client disconnect on the same ``receive`` channel
+    and swallow the body the import is reading.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+IMPORT_FORMATS = {
+    "text/csv": ImportFormat.CSV,
+    "application/x-ndjson": ImportFormat.NDJSON,
+    "application/jsonl": ImportFormat.NDJSON,
+}
+
+
 @router.post("/import")
-async def import_activities():
-    raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Not implemented yet")
+async def import_activities(
+    request: Request,
+    current_user: Annotated[User, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_db)],
+):
+    """Import a history from another tracker, streamed as CSV or NDJSON; responds with NDJSON progress lines."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = IMPORT_FORMATS.get(content_type)
+    if not fmt:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Upload the history as one of: {', '.join(IMPORT_FORMATS)}",
+        )
+
+    progress = import_activity_logs(session, current_user.id, iter_lines(request.stream()), fmt)
+    return ImportProgressResponse(
+        (json.dumps(update) + "\n" async for update in progress), media_type="application/x-ndjson"
+    )
@@ -1,19 +1,67 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies.auth import get_current_user
+from app.api.dependencies.auth import authenticate_token, get_current_user, optional_oauth2_scheme
 from app.database.session import get_db
 from app.models.user import User
-from app.services.live_status_service import get_live_status_for_user_rooms
+from app.services.live_status_service import (
+    get_live_status_changes,
+    get_live_status_for_user_rooms,
+    get_live_versions,
+    live_status_etag,
+    parse_live_versions,
+)
+from app.services.live_status_stream import stream_live_status
 
 router = APIRouter()
 
 
 @router.get("")
 async def get_live_status(
+    response: Response,
     current_user: Annotated[User, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_db)],
+    since: str = None,
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    return await get_live_status_for_user_rooms(session, current_user.id)
+    """Live status of all the user's rooms.
+
+    With ``since`` (the cursor of the previous answer, empty at first), only the rooms whose live
+    version moved since then are returned, together with the next cursor. The cursor is the
+    comma-separated ``<room_id>:<version>`` pairs of the user's rooms; it is the only cursor format
+    of the live-status API.
+    """
+    # read the versions before the state, so a change in between is picked up by the next poll
+    versions = await get_live_versions(session, current_user.id)
+    etag = live_status_etag(versions)
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    if since is None:
+        response.headers["ETag"] = etag
+        return await get_live_status_for_user_rooms(session, current_user.id)
+
+    known = parse_live_versions(since)
+    if known == versions:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return await get_live_status_changes(session, versions, known)
+
+
+@router.get("/stream")
+async def stream_live_status_endpoint(
+    # released before streaming starts, so an open stream does not hold a pooled connection
+    session: Annotated[AsyncSession, Depends(get_db, scope="function")],
+    header_token: Annotated[str | None, Depends(optional_oauth2_scheme)],
+    token: str = None,  # EventSource cannot send headers
+):
+    current_user = await authenticate_token(session, header_token or token)
+    return StreamingResponse(
+        await stream_live_status(session, current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,9 @@
+from datetime import date
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_user
@@ -15,9 +16,12 @@ from app.api.schema.room import (
     RoomCreate,
     RoomResponse,
 )
+from app.api.schema.stats import RoomPeriodStats
 from app.database.session import get_db
 from app.models.user import User
-from app.services.mapping_service import delete_mapping, get_mappings, update_mapping
+from app.services.leaderboard_service import get_leaderboard
+from app.services.live_status_service import get_room_live_status, get_room_live_version
+from app.services.mapping_service import delete_mapping, get_mappings, update_mapping, update_mappings
 from app.services.objective_service import (
     create_objective,
     create_objective_group,
@@ -29,18 +33,35 @@ from app.services.objective_service import (
     update_objective_group,
 )
 from app.services.reaction_service import add_reaction, get_reactions
-from app.services.room_service import create_room, get_rooms, join_room, verify_room_admin
-from app.services.statistics_service import get_leaderboard, get_participant_stats
+from app.services.room_service import (
+    create_room,
+    get_rooms,
+    join_room,
+    remove_member,
+    verify_room_admin,
+    verify_room_member,
+)
+from app.services.statistics_service import get_participant_stats, get_room_period_stats
 
 router = APIRouter()
 
 
-class MappingUpdate(BaseModel):
+class MappingKey(BaseModel):
     activity_id: UUID
     objective_id: UUID
+
+
+class MappingUpdate(MappingKey):
     weight: float = 1.0
 
 
+class MappingBulkUpdate(BaseModel):
+    upsert: list[MappingUpdate] = Field(default_factory=list, max_length=500)
+    delete: list[MappingKey] = Field(default_factory=list, max_length=500)
+    # upsert is the complete mapping set of the user in the room, everything else is deleted
+    replace: bool = False
+
+
 class ReactionCreate(BaseModel):
     receiver_id: UUID
     emoji: str
@@ -151,13 +172,14 @@ async def delete_room_objective_group(
 
 
 @router.delete("/{room_id}/members/{user_id}")
-async def remove_member(
+async def remove_room_member(
     room_id: UUID,
     user_id: UUID,
     current_user: Annotated[User, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_db)],
 ):
     await verify_room_admin(session, room_id, current_user.id)
+    await remove_member(session, room_id, user_id)
     return {"status": "removed"}
 
 
@@ -195,6 +217,23 @@ async def update_activity_mapping(
     )
 
 
+@router.post("/{room_id}/mapping/bulk")
+async def update_activity_mappings(
+    room_id: UUID,
+    mappings_in: MappingBulkUpdate,
+    current_user: Annotated[User, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_db)],
+):
+    return await update_mappings(
+        session,
+        room_id,
+        current_user.id,
+        {(m.activity_id, m.objective_id): m.weight for m in mappings_in.upsert},
+        {(m.activity_id, m.objective_id) for m in mappings_in.delete},
+        mappings_in.replace,
+    )
+
+
 @router.get("/{room_id}/mapping")
 async def get_my_mappings(
     room_id: UUID,
@@ -213,13 +252,52 @@ async def get_room_stats(
     return await get_participant_stats(session, room_id)
 
 
+@router.get("/{room_id}/stats/periods", response_model=RoomPeriodStats)
+async def get_room_period_stats_endpoint(
+    room_id: UUID,
+    current_user: Annotated[User, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_db)],
+    start_date: date = None,
+    end_date: date = None,
+):
+    return await get_room_period_stats(session, room_id, start_date, end_date)
+
+
 @router.get("/{room_id}/leaderboard")
 async def get_room_leaderboard(
     room_id: UUID,
     current_user: Annotated[User, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_db)],
+    period: date = None,
+    objective_id: UUID = None,
+    limit: Annotated[int | None, Query(ge=1, le=500)] = None,
+    offset: Annotated[int, Query(ge=0)] = 0,
 ):
-    return await get_leaderboard(session, room_id)
+    return await get_leaderboard(session, room_id, period, objective_id, limit, offset, current_user.id)
+
+
+@router.get("/{room_id}/live-status")
+async def get_room_live_status_endpoint(
+    room_id: UUID,
+    response: Response,
+    current_user: Annotated[User, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_db)],
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """Live status of one room, answering 304 to ``If-None-Match`` until its version moves.
+
+    Clients watching several rooms poll ``/live-status`` with a ``since`` cursor instead.
+    """
+    await verify_room_member(session, room_id, current_user.id)
+
+    # read the version before the state, so a change in between is picked up by the next poll
+    version = await get_room_live_version(session, room_id)
+    etag = f'"{version}"'
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return {"version": version, "users": await get_room_live_status(session, room_id)}
 
 
 @router.post("/{room_id}/reactions")
@@ -1,35 +1,53 @@
+from datetime import date
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.api.dependencies.auth import get_current_user
-from app.api.schema.stats import PersonalStat
+from app.api.dependencies.auth import get_current_user, invalidate_principal
+from app.api.schema.stats import PersonalPeriodStats, PersonalStat
 from app.api.schema.user import PasswordUpdate, UserProfileResponse, UserSettingsResponse, UserSettingsUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_password_async
 from app.database.session import get_db
+from app.database.write import save
+from app.models.activity import ResolutionEnum
 from app.models.user import User, UserSettings
-from app.services.statistics_service import get_personal_stats
+from app.services.statistics_service import get_personal_period_stats, get_personal_stats
 
 router = APIRouter()
 
 
 @router.get("/me/stats", response_model=list[PersonalStat])
 async def read_user_stats(
-    current_user: Annotated[User, Depends(get_current_user)], session: Annotated[AsyncSession, Depends(get_db)]
+    current_user: Annotated[User, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_db)],
+    start_date: date = None,
+    end_date: date = None,
+):
+    return await get_personal_stats(session, current_user.id, start_date, end_date)
+
+
+@router.get("/me/stats/periods", response_model=PersonalPeriodStats)
+async def read_user_period_stats(
+    current_user: Annotated[User, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_db)],
+    resolution: ResolutionEnum = None,
+    start_date: date = None,
+    end_date: date = None,
 ):
-    return await get_personal_stats(session, current_user.id)
+    return await get_personal_period_stats(session, current_user.id, resolution, start_date, end_date)
 
 
 @router.get("/me", response_model=UserProfileResponse)
 async def read_users_me(
     current_user: Annotated[User, Depends(get_current_user)], session: Annotated[AsyncSession, Depends(get_db)]
 ):
-    result = await session.execute(select(User).options(selectinload(User.settings)).where(User.id == current_user.id))
-    user = result.scalar_one()
-    return user
+    # current_user is already loaded, only its settings are missing
+    result = await session.execute(select(UserSettings).where(UserSettings.user_id == current_user.id))
+    set_committed_value(current_user, "settings", result.scalar_one_or_none())
+    return current_user
 
 
 @router.patch("/me/password", status_code=status.HTTP_204_NO_CONTENT)
@@ -38,12 +56,13 @@ async def update_user_password(
     current_user: Annotated[User, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_db)],
 ):
-    if not verify_password(password_in.old_password, current_user.password_hash):
+    if not await verify_password_async(password_in.old_password, current_user.password_hash):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect old password")
 
-    current_user.password_hash = get_password_hash(password_in.new_password)
+    current_user.password_hash = await get_password_hash_async(password_in.new_password)
     session.add(current_user)
     await session.commit()
+    invalidate_principal(current_user.id)
     return
 
 
@@ -62,7 +81,5 @@ async def update_user_settings(
         session.add(settings)
 
     settings.theme = settings_in.theme
-    session.add(settings)
-    await session.commit()
-    await session.refresh(settings)
+    await save(session, settings)
     return settings
@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.activity import ResolutionEnum
 
@@ -42,6 +42,14 @@ class ActivityLogCreate(ActivityLogBase):
     pass
 
 
+class ActivityLogBatchItem(ActivityLogBase):
+    activity_id: UUID
+
+
+class ActivityLogBatchCreate(BaseModel):
+    logs: list[ActivityLogBatchItem] = Field(min_length=1, max_length=1000)
+
+
 class ActivityLogResponse(ActivityLogBase):
     id: UUID
     activity_id: UUID
@@ -49,6 +57,17 @@ class ActivityLogResponse(ActivityLogBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ActivityImportRow(BaseModel):
+    """One log of an imported history, as a CSV row or NDJSON object."""
+
+    id: str | None = None  # stable id of the log in the source tracker, if it has one
+    activity: str = Field(min_length=1)
+    timestamp: date
+    duration_minutes: int = Field(ge=0)
+    emoji: str = "📥"
+    color: str = "#808080"
+
+
 class StartActivityRequest(BaseModel):
     activity_id: UUID
 
@@ -1,7 +1,37 @@
+from datetime import date
+from uuid import UUID
+
 from pydantic import BaseModel
 
+from app.models.activity import ResolutionEnum
+
 
 class PersonalStat(BaseModel):
     name: str
     value: int
     color: str
+    is_live: bool = False
+    start_time: str | None = None
+
+
+class PersonalPeriodStat(BaseModel):
+    period_start: date
+    activity_id: UUID
+    minutes: int
+
+
+class PersonalPeriodStats(BaseModel):
+    resolution: ResolutionEnum
+    periods: list[PersonalPeriodStat]
+
+
+class ParticipantPeriodStat(BaseModel):
+    period_start: date
+    user_id: UUID
+    objective_id: UUID
+    minutes: float
+
+
+class RoomPeriodStats(BaseModel):
+    resolution: ResolutionEnum
+    periods: list[ParticipantPeriodStat]
@@ -8,10 +8,41 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Grindex"
     API_V1_STR: str = "/api/v1"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # authenticated users are cached per worker for this long, so most requests skip the users lookup
+    PRINCIPAL_CACHE_TTL: float = 30.0
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    # admin and members per room, used for authorization checks; other workers drop their entry
+    # on the change notification, or at the latest when it expires
+    ROOM_ACCESS_CACHE_TTL: float = 30.0
+    ROOM_ACCESS_CACHE_SIZE: int = 10_000
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     BACKEND_CORS_ORIGINS: list[str] = []
     SECRET_KEY: str
     WS_BACKEND_URL: str
+    # one pooled keep-alive client per worker talks to ws-backend
+    WS_BACKEND_CONNECT_TIMEOUT: float = 2.0
+    WS_BACKEND_TIMEOUT: float = 5.0
+    WS_BACKEND_MAX_CONNECTIONS: int = 20
+    # tracker events go through the outbox table and are relayed to ws-backend in batches
+    LIVE_STATUS_COALESCE_WINDOW: float = 0.2  # seconds
+    LIVE_STATUS_POLL_INTERVAL: float = 1.0  # seconds between outbox polls without local events
+    LIVE_STATUS_BATCH_SIZE: int = 100
+    LIVE_STATUS_MAX_RETRIES: int = 3
+    LIVE_STATUS_RETRY_BACKOFF: float = 0.5  # seconds, doubled on every retry
+    # server-sent live-status streams
+    LIVE_STATUS_STREAM_KEEPALIVE: float = 15.0  # seconds between keepalive comments
+    LIVE_STATUS_STREAM_QUEUE_SIZE: int = 1000  # pending changes per stream before it has to resync
+
+    # activity history imports
+    IMPORT_BATCH_SIZE: int = 5000  # logs written and committed at once
+    IMPORT_MAX_LINE_LENGTH: int = 64 * 1024  # longer lines are rejected as invalid rows
+
+    # Argon2 runs in a thread pool of this size, so logins never block the event loop
+    PASSWORD_HASH_CONCURRENCY: int = 2
+    # changing these rehashes existing passwords on the next successful login
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
 
     POSTGRES_HOST: str
     POSTGRES_PORT: int
@@ -19,6 +50,17 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DATABASE: str
 
+    # every worker process holds its own pool: with APP_WORKERS workers, Postgres must accept
+    # APP_WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 to keep connections forever
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection, 0 behind pgbouncer
+    # /metrics answers 404 unless this is set, and then requires it as a bearer token
+    METRICS_TOKEN: str | None = None
+
     @cached_property
     def DATABASE_URL(self) -> str:
         return URL.create(
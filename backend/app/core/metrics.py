@@ -0,0 +1,13 @@
+from collections.abc import Callable
+
+# Collectors return a snapshot of their values when ``GET /metrics`` is scraped.
+# Every worker process keeps its own values, so with APP_WORKERS > 1 each scrape sees one worker.
+_collectors: dict[str, Callable[[], dict]] = {}
+
+
+def register_collector(name: str, collector: Callable[[], dict]) -> None:
+    _collectors[name] = collector
+
+
+def collect() -> dict[str, dict]:
+    return {name: collector() for name, collector in _collectors.items()}
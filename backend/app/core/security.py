@@ -1,3 +1,6 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
@@ -6,8 +9,16 @@ from argon2.exceptions import VerifyMismatchError
 from jose import jwt
 
 from app.core.config import settings
+from app.core.metrics import register_collector
 
-ph = PasswordHasher()
+ph = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
+
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_CONCURRENCY, thread_name_prefix="argon2")
+_hash_jobs = {"pending": 0, "completed": 0}
 
 ALGORITHM = "HS256"
 
@@ -53,3 +64,39 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return ph.hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return ph.check_needs_rehash(hashed_password)
+
+
+async def _run_hash_job(func: Callable[..., Any], *args) -> Any:
+    _hash_jobs["pending"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_jobs["pending"] -= 1
+        _hash_jobs["completed"] += 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` on the hashing thread pool instead of the event loop."""
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """``get_password_hash`` on the hashing thread pool instead of the event loop."""
+    return await _run_hash_job(get_password_hash, password)
+
+
+def _hashing_stats() -> dict:
+    concurrency = settings.PASSWORD_HASH_CONCURRENCY
+    return {
+        "concurrency": concurrency,
+        "running": min(_hash_jobs["pending"], concurrency),
+        "queued": max(_hash_jobs["pending"] - concurrency, 0),
+        "completed": _hash_jobs["completed"],
+    }
+
+
+register_collector("password_hashing", _hashing_stats)
@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+
+from sqlalchemy import Date, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement, FunctionElement
+
+from app.models.activity import ResolutionEnum
+
+
+class _PeriodStart(FunctionElement):
+    type = Date()
+    name = "period_start"
+    inherit_cache = True
+
+
+@compiles(_PeriodStart)
+def _compile_period_start(element, compiler, **kw):
+    day, resolution = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"CAST(date_trunc({resolution}, CAST({day} AS TIMESTAMP)) AS DATE)"
+
+
+@compiles(_PeriodStart, "sqlite")
+def _compile_period_start_sqlite(element, compiler, **kw):
+    day, resolution = (compiler.process(clause, **kw) for clause in element.clauses)
+    return (
+        f"CASE {resolution} "
+        f"WHEN 'week' THEN date({day}, '-6 days', 'weekday 1') "
+        f"WHEN 'month' THEN date({day}, 'start of month') "
+        f"WHEN 'year' THEN date({day}, 'start of year') "
+        f"ELSE date({day}) END"
+    )
+
+
+def period_start(day, resolution: ResolutionEnum | str | ColumnElement[str]) -> ColumnElement[date]:
+    """SQL expression for the first day of the ``resolution`` period containing ``day``.
+
+    ``resolution`` is either a ``ResolutionEnum`` value or a column holding one.
+    Constant resolutions are inlined rather than bound, so the same expression
+    can be repeated in ``GROUP BY``.
+    """
+    if isinstance(resolution, str):
+        resolution = literal_column(f"'{ResolutionEnum(resolution).value}'")
+    return _PeriodStart(day, resolution)
+
+
+def truncate_date(day: date, resolution: ResolutionEnum | str) -> date:
+    """Python counterpart of ``period_start`` (weeks start on Monday)."""
+    resolution = ResolutionEnum(resolution)
+    if resolution == ResolutionEnum.WEEK:
+        return day - timedelta(days=day.weekday())
+    if resolution == ResolutionEnum.MONTH:
+        return day.replace(day=1)
+    if resolution == ResolutionEnum.YEAR:
+        return day.replace(month=1, day=1)
+    return day
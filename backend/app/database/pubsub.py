@@ -0,0 +1,110 @@
+import asyncio
+import contextlib
+import json
+import logging
+from collections.abc import Callable
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+CHANGE_CHANNEL = "grindex_changes"
+
+# sent to every subscriber after (re)connecting, since notifications may have been missed meanwhile
+RESET = {"table": None, "op": "RESET"}
+
+ChangeCallback = Callable[[dict], None]
+
+
+class ChangeListener:
+    """LISTENs for the row changes that database triggers publish with ``pg_notify``.
+
+    Every worker holds one dedicated asyncpg connection for this, outside the engine pool, and fans
+    the changes out to in-process subscribers by table. Callbacks run on the event loop and must not
+    block. The connection is re-established with backoff when it drops or fails in any other way.
+    """
+
+    def __init__(self, channel: str = CHANGE_CHANNEL, retry_backoff: float = 1.0):
+        self.channel = channel
+        self.retry_backoff = retry_backoff
+        self._subscribers: dict[str, list[ChangeCallback]] = {}
+        self._task: asyncio.Task | None = None
+        self.received = 0
+        self.connected = False
+
+    def subscribe(self, table: str, callback: ChangeCallback) -> None:
+        """Call ``callback`` with every change of ``table``, and with ``RESET`` after (re)connecting."""
+        self._subscribers.setdefault(table, []).append(callback)
+
+    def dispatch(self, change: dict) -> None:
+        if change["op"] == "RESET":
+            callbacks = [callback for callbacks in self._subscribers.values() for callback in callbacks]
+        else:
+            callbacks = self._subscribers.get(change["table"], [])
+
+        for callback in callbacks:
+            try:
+                callback(change)
+            except Exception:
+                logger.exception("Change subscriber failed on %s", change)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        self.received += 1
+        self.dispatch(json.loads(payload))
+
+    async def _run(self) -> None:
+        backoff = self.retry_backoff
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    host=settings.POSTGRES_HOST,
+                    port=settings.POSTGRES_PORT,
+                    user=settings.POSTGRES_USER,
+                    password=settings.POSTGRES_PASSWORD,
+                    database=settings.POSTGRES_DATABASE,
+                )
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _, closed=closed: closed.set())
+                await connection.add_listener(self.channel, self._on_notification)
+
+                self.connected = True
+                backoff = self.retry_backoff
+                self.dispatch(RESET)
+                await closed.wait()
+                logger.warning("Change listener connection lost, reconnecting")
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Change listener cannot connect, retrying in %.0fs: %s", backoff, e)
+            except Exception:
+                # e.g. an InterfaceError when the connection is closed under us; giving up would stop
+                # invalidating the caches of this worker for good
+                logger.exception("Change listener failed, reconnecting in %.0fs", backoff)
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    with contextlib.suppress(Exception):
+                        await connection.close()
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def stats(self) -> dict:
+        return {"connected": self.connected, "received": self.received}
+
+
+change_listener = ChangeListener()
+register_collector("change_listener", change_listener.stats)
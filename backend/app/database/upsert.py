@@ -0,0 +1,13 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(session: AsyncSession, table):
+    """Build an INSERT supporting ``on_conflict_do_*`` for the dialect the session is bound to.
+
+    Production runs on PostgreSQL, while the test suite runs on SQLite; both
+    understand ``ON CONFLICT``, but SQLAlchemy exposes it per dialect.
+    """
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
@@ -0,0 +1,13 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def save(session: AsyncSession, *instances) -> None:
+    """Add ``instances`` and commit, leaving them ready to be returned.
+
+    The models map with ``eager_defaults``, so server-generated values such as
+    ``created_at`` come back through ``INSERT/UPDATE .. RETURNING`` in the flush
+    itself, and sessions keep them loaded past the commit (``expire_on_commit=False``),
+    so no refresh is needed afterwards.
+    """
+    session.add_all(instances)
+    await session.commit()
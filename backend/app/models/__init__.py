@@ -1,12 +1,15 @@
 from app.models.active_activity import ActiveActivity
-from app.models.activity import Activity, ActivityLog
+from app.models.activity import Activity, ActivityDailyTotal, ActivityLog
+from app.models.leaderboard import LeaderboardEntry
 from app.models.mapping import ActivityObjectiveMapping, Reaction
+from app.models.outbox import OutboxEvent
 from app.models.room import Objective, ObjectiveGroup, Room, RoomMember
 from app.models.user import User, UserSettings
 
 __all__ = [
     "Activity",
     "ActivityLog",
+    "ActivityDailyTotal",
     "ActiveActivity",
     "Room",
     "RoomMember",
@@ -14,6 +17,8 @@ __all__ = [
     "ObjectiveGroup",
     "ActivityObjectiveMapping",
     "Reaction",
+    "LeaderboardEntry",
+    "OutboxEvent",
     "User",
     "UserSettings",
 ]
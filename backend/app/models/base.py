@@ -2,4 +2,5 @@ from sqlalchemy.orm import DeclarativeBase
 
 
 class Base(DeclarativeBase):
-    pass
+    # fetch server defaults and onupdate values with RETURNING while flushing, instead of on the next access
+    __mapper_args__ = {"eager_defaults": True}
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, String, func
+from sqlalchemy import DateTime, Float, ForeignKey, Index, String, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -12,6 +12,18 @@ from app.models.base import Base
 
 class ActivityObjectiveMapping(Base):
     __tablename__ = "activity_objective_mappings"
+    __table_args__ = (
+        # also serves the (room_id, user_id) lookups
+        UniqueConstraint(
+            "room_id",
+            "user_id",
+            "activity_id",
+            "objective_id",
+            name="uq_activity_objective_mappings_room_user_activity_objective",
+        ),
+        Index("ix_activity_objective_mappings_user_id_activity_id", "user_id", "activity_id"),
+        Index("ix_activity_objective_mappings_activity_id", "activity_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"))
@@ -29,6 +41,7 @@ class ActivityObjectiveMapping(Base):
 
 class Reaction(Base):
     __tablename__ = "reactions"
+    __table_args__ = (Index("ix_reactions_room_id_receiver_id_emoji", "room_id", "receiver_id", "emoji"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     room_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("rooms.id"))
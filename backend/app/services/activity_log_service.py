@@ -1,12 +1,13 @@
 from datetime import date
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.schema.activity import ActivityLogCreate
+from app.api.schema.activity import ActivityLogBatchItem, ActivityLogCreate
 from app.models.activity import Activity, ActivityLog
+from app.services.rollup_service import add_logged_minutes
 
 
 async def log_activity(
@@ -20,11 +21,36 @@ async def log_activity(
 
     log = ActivityLog(activity_id=activity_id, timestamp=log_in.timestamp, duration_minutes=log_in.duration_minutes)
     session.add(log)
+    await add_logged_minutes(session, [(activity_id, log.timestamp, log.duration_minutes)])
     await session.commit()
-    await session.refresh(log)
     return log
 
 
+async def log_activities(session: AsyncSession, logs: list[ActivityLogBatchItem], user_id: UUID) -> list[dict]:
+    """Write logs of any of the user's activities with a constant number of statements, in the order given."""
+    # verify all activities exist and belong to user
+    activity_ids = {log.activity_id for log in logs}
+    result = await session.execute(
+        select(Activity.id).where(Activity.id.in_(activity_ids), Activity.user_id == user_id)
+    )
+    if activity_ids - set(result.scalars()):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
+
+    rows = [
+        {
+            "id": uuid4(),
+            "activity_id": log.activity_id,
+            "timestamp": log.timestamp,
+            "duration_minutes": log.duration_minutes,
+        }
+        for log in logs
+    ]
+    await session.execute(insert(ActivityLog).values(rows))
+    await add_logged_minutes(session, [(row["activity_id"], row["timestamp"], row["duration_minutes"]) for row in rows])
+    await session.commit()
+    return rows
+
+
 async def get_activity_logs(
     session: AsyncSession, activity_id: UUID, user_id: UUID, start_date: date = None, end_date: date = None
 ) -> list[ActivityLog]:
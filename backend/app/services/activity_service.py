@@ -5,14 +5,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schema.activity import ActivityCreate, ActivityUpdate
+from app.database.write import save
 from app.models.activity import Activity
 
 
 async def create_activity(session: AsyncSession, activity_in: ActivityCreate, user_id: UUID) -> Activity:
     activity = Activity(**activity_in.model_dump(), user_id=user_id)
-    session.add(activity)
-    await session.commit()
-    await session.refresh(activity)
+    await save(session, activity)
     return activity
 
 
@@ -39,7 +38,5 @@ async def update_activity(session: AsyncSession, activity: Activity, activity_in
     for key, value in update_data.items():
         setattr(activity, key, value)
 
-    session.add(activity)
-    await session.commit()
-    await session.refresh(activity)
+    await save(session, activity)
     return activity
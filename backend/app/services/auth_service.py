@@ -3,7 +3,8 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schema.auth import UserCreate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, password_needs_rehash, verify_password_async
+from app.database.write import save
 from app.models.user import User, UserSettings
 
 
@@ -17,17 +18,13 @@ async def register_user(session: AsyncSession, user_in: UserCreate) -> User:
 
     user = User(
         email=user_in.email,
-        password_hash=get_password_hash(user_in.password),
+        password_hash=await get_password_hash_async(user_in.password),
         full_name=user_in.full_name,
     )
     session.add(user)
     await session.flush()
 
-    settings = UserSettings(user_id=user.id)
-    session.add(settings)
-
-    await session.commit()
-    await session.refresh(user)
+    await save(session, UserSettings(user_id=user.id))
     return user
 
 
@@ -36,6 +33,11 @@ async def authenticate_user(session: AsyncSession, email: str, password: str) ->
     user = result.scalar_one_or_none()
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         return None
+
+    # the hasher parameters changed since this password was set
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await get_password_hash_async(password)
+        await session.commit()
     return user
@@ -0,0 +1,243 @@
+import codecs
+import csv
+import json
+import uuid
+from collections import Counter
+from collections.abc import AsyncIterator
+from enum import Enum
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import Column, Date, Integer, MetaData, Table, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schema.activity import ActivityImportRow
+from app.core.config import settings
+from app.database.upsert import dialect_insert
+from app.models.activity import Activity, ActivityLog
+from app.models.user import ResolutionEnum, UserSettings
+from app.services.rollup_service import add_logged_minutes
+
+# log ids are derived from the user and the row's content, so re-importing a file skips what is already there
+IMPORT_NAMESPACE = UUID("5f0c7d1e-8a43-4b6e-9d2f-1c3b7a9e4f60")
+MAX_REPORTED_ERRORS = 10
+
+# per-connection staging table that COPY writes into before the merge into activity_logs
+_staging = Table(
+    "activity_log_import",
+    MetaData(),
+    Column("id", postgresql.UUID(as_uuid=True)),
+    Column("activity_id", postgresql.UUID(as_uuid=True)),
+    Column("timestamp", Date),
+    Column("duration_minutes", Integer),
+)
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+def _log_id(user_id: UUID, row: ActivityImportRow, occurrence: int) -> UUID:
+    # the source id alone is not enough: other trackers number their logs 1, 2, 3 too
+    key = [str(user_id), row.activity, row.timestamp.isoformat(), row.duration_minutes, row.id, occurrence]
+    return uuid.uuid5(IMPORT_NAMESPACE, json.dumps(key))
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_length: int = settings.IMPORT_MAX_LINE_LENGTH
+) -> AsyncIterator[str | None]:
+    """Decode an uploaded body into lines as it arrives; ``None`` stands for a line longer than ``max_length``."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    discarding = False
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if discarding:
+                discarding = False
+                continue
+            yield line.rstrip("\r") if len(line) <= max_length else None
+        if len(buffer) > max_length and not discarding:
+            # drop the rest of the line instead of buffering it
+            discarding = True
+            buffer = ""
+            yield None
+        elif discarding:
+            buffer = ""
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer and not discarding:
+        yield buffer.rstrip("\r")
+
+
+async def _parse_records(lines: AsyncIterator[str | None], fmt: ImportFormat) -> AsyncIterator[tuple[int, dict | None]]:
+    """``(line number, record)`` pairs, with ``None`` records for lines that cannot be parsed.
+
+    CSV needs a header row; quoted fields cannot span lines.
+    """
+    header = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if line is not None and not line.strip():
+            continue
+        try:
+            if line is None:
+                record = None
+            elif fmt is ImportFormat.NDJSON:
+                record = json.loads(line)
+                record = record if isinstance(record, dict) else None
+            elif header is None:
+                header = next(csv.reader([line]))
+                continue
+            else:
+                values = next(csv.reader([line]))
+                # empty cells fall back to the defaults
+                record = {k: v for k, v in zip(header, values, strict=True) if v != ""}
+        except (ValueError, csv.Error):
+            record = None
+        yield line_number, record
+
+
+async def _resolve_activities(
+    session: AsyncSession,
+    user_id: UUID,
+    rows: list[ActivityImportRow],
+    activity_ids: dict[str, UUID],
+    resolution: ResolutionEnum,
+) -> int:
+    """Fill ``activity_ids`` for the activity names of ``rows``, creating the missing ones; returns how many were created."""
+    names = {row.activity for row in rows} - activity_ids.keys()
+    if not names:
+        return 0
+
+    result = await session.execute(
+        select(Activity.name, Activity.id).where(Activity.user_id == user_id, Activity.name.in_(names))
+    )
+    for name, activity_id in result:
+        activity_ids.setdefault(name, activity_id)
+
+    created = 0
+    for row in rows:
+        if row.activity not in activity_ids:
+            activity = Activity(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                name=row.activity,
+                emoji=row.emoji,
+                color=row.color,
+                resolution=resolution,
+            )
+            session.add(activity)
+            activity_ids[row.activity] = activity.id
+            created += 1
+    await session.flush()
+    return created
+
+
+async def _insert_logs(session: AsyncSession, logs: list[dict]) -> list[tuple]:
+    """Insert the logs not imported before, returning ``(activity_id, timestamp, duration_minutes)`` of the new ones."""
+    returning = (ActivityLog.activity_id, ActivityLog.timestamp, ActivityLog.duration_minutes)
+
+    if session.get_bind().dialect.name != "postgresql":
+        stmt = dialect_insert(session, ActivityLog).values(logs).on_conflict_do_nothing(index_elements=["id"])
+        result = await session.execute(stmt.returning(*returning))
+        return result.all()
+
+    # COPY the batch into a staging table and merge it in one statement
+    connection = await session.connection()
+    await connection.execute(
+        text(
+            "CREATE TEMPORARY TABLE IF NOT EXISTS activity_log_import "
+            "(id uuid, activity_id uuid, timestamp date, duration_minutes integer) ON COMMIT DELETE ROWS"
+        )
+    )
+    raw_connection = await connection.get_raw_connection()
+    columns = [column.name for column in _staging.columns]
+    await raw_connection.driver_connection.copy_records_to_table(
+        _staging.name, records=[tuple(log[column] for column in columns) for log in logs], columns=columns
+    )
+    stmt = (
+        postgresql.insert(ActivityLog)
+        .from_select(columns, select(*_staging.columns))
+        .on_conflict_do_nothing(index_elements=["id"])
+    )
+    result = await session.execute(stmt.returning(*returning))
+    return result.all()
+
+
+async def import_activity_logs(
+    session: AsyncSession,
+    user_id: UUID,
+    lines: AsyncIterator[str | None],
+    fmt: ImportFormat,
+    batch_size: int = settings.IMPORT_BATCH_SIZE,
+) -> AsyncIterator[dict]:
+    """Import a tracker history line by line, yielding progress after every committed batch.
+
+    Activities are matched by name and created when missing. Every batch commits on its own, and log
+    ids derive from each row's content and source ``id``, so an interrupted import can simply be re-run
+    while other files never collide with it. Identical rows without an ``id`` are told apart by how
+    often they occurred before, which is the only state besides the batch that grows with the file.
+    """
+    result = await session.execute(select(UserSettings.resolution).where(UserSettings.user_id == user_id))
+    resolution = result.scalar_one_or_none() or ResolutionEnum.DAY
+
+    progress = {"rows": 0, "imported": 0, "duplicates": 0, "invalid": 0, "activities_created": 0}
+    errors = []
+    activity_ids: dict[str, UUID] = {}
+    batch: list[tuple[UUID, ActivityImportRow]] = []
+    occurrences = Counter()
+
+    async def flush() -> dict:
+        rows = [row for _, row in batch]
+        progress["activities_created"] += await _resolve_activities(session, user_id, rows, activity_ids, resolution)
+        logs = [
+            {
+                "id": log_id,
+                "activity_id": activity_ids[row.activity],
+                "timestamp": row.timestamp,
+                "duration_minutes": row.duration_minutes,
+            }
+            for log_id, row in batch
+        ]
+        inserted = await _insert_logs(session, logs)
+        await add_logged_minutes(session, inserted)
+        await session.commit()
+
+        progress["imported"] += len(inserted)
+        progress["duplicates"] += len(logs) - len(inserted)
+        batch.clear()
+        return dict(progress)
+
+    async for line_number, record in _parse_records(lines, fmt):
+        progress["rows"] += 1
+        try:
+            row = ActivityImportRow.model_validate(record) if record is not None else None
+        except ValidationError as e:
+            error = e.errors()[0]
+            row, message = None, f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}"
+        else:
+            message = "Malformed line"
+        if row is None:
+            progress["invalid"] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_number, "error": message})
+            continue
+
+        occurrence = 0
+        if row.id is None:
+            # repeated sessions of the same length on the same day are separate logs
+            content = (row.activity, row.timestamp, row.duration_minutes)
+            occurrence = occurrences[content]
+            occurrences[content] += 1
+        batch.append((_log_id(user_id, row, occurrence), row))
+        if len(batch) >= batch_size:
+            yield await flush()
+
+    if batch:
+        await flush()
+    yield {**progress, "errors": errors, "done": True}
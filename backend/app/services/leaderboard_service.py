@@ -0,0 +1,251 @@
+from collections.abc import Mapping
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import and_, column, delete, func, or_, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.periods import period_start, truncate_date
+from app.database.upsert import dialect_insert
+from app.models.active_activity import ActiveActivity
+from app.models.activity import ActivityDailyTotal
+from app.models.leaderboard import LeaderboardEntry
+from app.models.mapping import ActivityObjectiveMapping
+from app.models.room import Room, RoomMember
+from app.models.user import User
+
+# Every write below adds to existing entries instead of overwriting them. Increments commute, so
+# concurrent log writes never lose minutes, and a rebuild that races with a log write either sees
+# its daily total or gets its increment added on top of the rebuilt row, never both.
+# Log writers hold a key-share lock on their activities and mapping changes lock the activity for
+# update, so a log never misses a mapping that the concurrent rebuild did not count it in either.
+# Rebuilds of the same member are serialized through the room_members row lock.
+# Locks are always taken in the order activities, room_members, rooms (the live version bump),
+# leaderboard entries, so log writers, mapping changes and rebuilds cannot deadlock each other.
+
+
+async def _add_entries(session: AsyncSession, entries) -> None:
+    stmt = dialect_insert(session, LeaderboardEntry).from_select(
+        ["room_id", "objective_id", "period_start", "user_id", "minutes"], entries
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            LeaderboardEntry.room_id,
+            LeaderboardEntry.objective_id,
+            LeaderboardEntry.period_start,
+            LeaderboardEntry.user_id,
+        ],
+        set_={"minutes": LeaderboardEntry.minutes + stmt.excluded.minutes},
+    )
+    await session.execute(stmt)
+
+
+def _entries_from_daily_totals(*where):
+    period = period_start(ActivityDailyTotal.day, Room.resolution)
+    return (
+        select(
+            ActivityObjectiveMapping.room_id,
+            ActivityObjectiveMapping.objective_id,
+            period,
+            ActivityObjectiveMapping.user_id,
+            func.sum(ActivityDailyTotal.minutes * ActivityObjectiveMapping.weight),
+        )
+        .join(ActivityDailyTotal, ActivityDailyTotal.activity_id == ActivityObjectiveMapping.activity_id)
+        .join(Room, Room.id == ActivityObjectiveMapping.room_id)
+        .where(*where)
+        .group_by(
+            ActivityObjectiveMapping.room_id,
+            ActivityObjectiveMapping.objective_id,
+            period,
+            ActivityObjectiveMapping.user_id,
+        )
+    )
+
+
+async def add_minutes_to_leaderboards(session: AsyncSession, totals: Mapping[tuple[UUID, date], int]) -> None:
+    """Add freshly logged ``(activity_id, day) -> minutes`` to every leaderboard the activities are mapped to."""
+    if not totals:
+        return
+
+    # a single statement however many activities and days were logged
+    logged = (
+        values(
+            column("activity_id", ActivityObjectiveMapping.activity_id.type),
+            column("day", ActivityDailyTotal.day.type),
+            column("minutes", ActivityDailyTotal.minutes.type),
+            name="logged",
+        )
+        .data([(activity_id, day, minutes) for (activity_id, day), minutes in totals.items()])
+        .cte()
+    )
+    period = period_start(logged.c.day, Room.resolution)
+    entries = (
+        select(
+            ActivityObjectiveMapping.room_id,
+            ActivityObjectiveMapping.objective_id,
+            period,
+            ActivityObjectiveMapping.user_id,
+            func.sum(logged.c.minutes * ActivityObjectiveMapping.weight),
+        )
+        .join(logged, logged.c.activity_id == ActivityObjectiveMapping.activity_id)
+        .join(Room, Room.id == ActivityObjectiveMapping.room_id)
+        .group_by(
+            ActivityObjectiveMapping.room_id,
+            ActivityObjectiveMapping.objective_id,
+            period,
+            ActivityObjectiveMapping.user_id,
+        )
+    )
+    await _add_entries(session, entries)
+
+
+async def rebuild_member_leaderboard(session: AsyncSession, room_id: UUID, user_id: UUID, *objective_ids: UUID) -> None:
+    """Recompute one member's entries for some objectives, e.g. after a mapping weight change.
+
+    The caller must hold the lock on the member's ``room_members`` row.
+    """
+    await session.execute(
+        delete(LeaderboardEntry).where(
+            LeaderboardEntry.room_id == room_id,
+            LeaderboardEntry.user_id == user_id,
+            LeaderboardEntry.objective_id.in_(objective_ids),
+        )
+    )
+    await _add_entries(
+        session,
+        _entries_from_daily_totals(
+            ActivityObjectiveMapping.room_id == room_id,
+            ActivityObjectiveMapping.user_id == user_id,
+            ActivityObjectiveMapping.objective_id.in_(objective_ids),
+        ),
+    )
+
+
+async def rebuild_room_leaderboard(session: AsyncSession, room_id: UUID) -> None:
+    """Recompute all entries of a room from the daily rollup and mark its leaderboard as ready."""
+    # lock out mapping changes and concurrent rebuilds of the same room
+    await session.execute(select(RoomMember.user_id).where(RoomMember.room_id == room_id).with_for_update())
+    result = await session.execute(select(Room.leaderboard_ready).where(Room.id == room_id).with_for_update())
+    if result.scalar_one_or_none() is not False:
+        return  # rebuilt by someone else in the meantime (or the room is gone)
+
+    await session.execute(delete(LeaderboardEntry).where(LeaderboardEntry.room_id == room_id))
+    await _add_entries(session, _entries_from_daily_totals(ActivityObjectiveMapping.room_id == room_id))
+    await session.execute(update(Room).where(Room.id == room_id).values(leaderboard_ready=True))
+
+
+async def get_leaderboard(
+    session: AsyncSession,
+    room_id: UUID,
+    period: date = None,
+    objective_id: UUID = None,
+    limit: int = None,
+    offset: int = 0,
+    user_id: UUID = None,
+) -> list[dict]:
+    """Rankings per objective, either all-time or for the room period containing ``period``.
+
+    Ranks are computed in SQL, so only the ``limit`` rankings after ``offset`` of each objective are
+    loaded. Ties share a rank. When ``user_id`` is given, every objective also reports that member's
+    own ``my_rank``, even if it falls outside the requested page.
+    """
+    result = await session.execute(select(Room.resolution, Room.leaderboard_ready).where(Room.id == room_id))
+    room = result.one_or_none()
+    if room is None:
+        return []
+
+    resolution, ready = room
+    if not ready:
+        await rebuild_room_leaderboard(session, room_id)
+        await session.commit()
+
+    mapping_filter = [ActivityObjectiveMapping.room_id == room_id]
+    if objective_id:
+        mapping_filter.append(ActivityObjectiveMapping.objective_id == objective_id)
+
+    # every mapped member is ranked, even without any time in the period
+    ranked = (
+        select(ActivityObjectiveMapping.objective_id, ActivityObjectiveMapping.user_id)
+        .where(*mapping_filter)
+        .distinct()
+        .subquery()
+    )
+    entry_join = [
+        LeaderboardEntry.room_id == room_id,
+        LeaderboardEntry.objective_id == ranked.c.objective_id,
+        LeaderboardEntry.user_id == ranked.c.user_id,
+    ]
+    if period:
+        entry_join.append(LeaderboardEntry.period_start == truncate_date(period, resolution))
+
+    scores = (
+        select(
+            ranked.c.objective_id,
+            ranked.c.user_id,
+            func.coalesce(func.sum(LeaderboardEntry.minutes), 0.0).label("minutes"),
+        )
+        .outerjoin(LeaderboardEntry, and_(*entry_join))
+        .group_by(ranked.c.objective_id, ranked.c.user_id)
+        .subquery()
+    )
+    positions = select(
+        scores,
+        func.rank().over(partition_by=scores.c.objective_id, order_by=scores.c.minutes.desc()).label("rank"),
+        func.row_number()
+        .over(partition_by=scores.c.objective_id, order_by=(scores.c.minutes.desc(), scores.c.user_id))
+        .label("position"),
+    ).subquery()
+
+    page = positions.c.position > offset
+    if limit is not None:
+        page = and_(page, positions.c.position <= offset + limit)
+    result = await session.execute(
+        select(
+            positions.c.objective_id,
+            positions.c.user_id,
+            User.full_name,
+            positions.c.minutes,
+            positions.c.rank,
+            page.label("in_page"),
+        )
+        .join(User, User.id == positions.c.user_id)
+        .where(or_(page, positions.c.user_id == user_id) if user_id else page)
+        .order_by(positions.c.objective_id, positions.c.position)
+    )
+    rows = result.all()
+
+    live_result = await session.execute(
+        select(ActivityObjectiveMapping.objective_id, ActiveActivity.user_id, ActiveActivity.start_time)
+        .join(
+            ActiveActivity,
+            and_(
+                ActiveActivity.user_id == ActivityObjectiveMapping.user_id,
+                ActiveActivity.activity_id == ActivityObjectiveMapping.activity_id,
+            ),
+        )
+        .where(*mapping_filter)
+    )
+    live = {(row.objective_id, row.user_id): row.start_time for row in live_result}
+
+    leaderboard = {}
+    for row_objective_id, row_user_id, full_name, total_minutes, rank, in_page in rows:
+        objective = leaderboard.setdefault(row_objective_id, {"objective_id": row_objective_id, "rankings": []})
+        if user_id:
+            objective.setdefault("my_rank", None)
+        if row_user_id == user_id:
+            objective["my_rank"] = {"rank": rank, "minutes": total_minutes}
+        if not in_page:
+            continue
+
+        rank_entry = {
+            "user_id": row_user_id,
+            "user_full_name": full_name,
+            "minutes": total_minutes,
+            "rank": rank,
+            "is_live": (row_objective_id, row_user_id) in live,
+        }
+        if rank_entry["is_live"]:
+            rank_entry["start_time"] = live[(row_objective_id, row_user_id)].isoformat()
+        objective["rankings"].append(rank_entry)
+
+    return list(leaderboard.values())
@@ -0,0 +1,247 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime
+from uuid import UUID
+
+import httpx
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import register_collector
+from app.database.pubsub import change_listener
+from app.database.session import AsyncSessionLocal
+from app.models.outbox import OutboxEvent
+from app.services.notification_service import LiveStatusEvent, build_live_status_updates, get_ws_client
+
+logger = logging.getLogger(__name__)
+
+LIVE_STATUS_TOPIC = "live_status"
+
+
+def add_live_status_event(
+    session: AsyncSession,
+    user_id: UUID,
+    activity_id: UUID,
+    active: bool,
+    start_time: datetime | None = None,
+    previous_activity_id: UUID | None = None,
+) -> None:
+    """Record a tracker event in the outbox, to be committed together with the tracker change itself.
+
+    A switch is one event: the start of ``activity_id`` carrying the ``previous_activity_id`` it replaced.
+    """
+    session.add(
+        OutboxEvent(
+            topic=LIVE_STATUS_TOPIC,
+            payload={
+                "user_id": str(user_id),
+                "activity_id": str(activity_id),
+                "active": active,
+                "start_time": start_time.isoformat() if start_time else None,
+                "previous_activity_id": str(previous_activity_id) if previous_activity_id else None,
+            },
+        )
+    )
+
+
+def _events_from_payload(payload: dict) -> list[LiveStatusEvent]:
+    user_id = UUID(payload["user_id"])
+    event = LiveStatusEvent(
+        user_id,
+        UUID(payload["activity_id"]),
+        payload["active"],
+        datetime.fromisoformat(payload["start_time"]) if payload["start_time"] else None,
+    )
+    if previous_activity_id := payload.get("previous_activity_id"):
+        return [LiveStatusEvent(user_id, UUID(previous_activity_id), False), event]
+    return [event]
+
+
+class LiveStatusDispatcher:
+    """Relays live-status events from the outbox to ws-backend in the background, off the request path.
+
+    Every worker runs one. Batches are claimed with ``FOR UPDATE SKIP LOCKED``, so workers share the
+    backlog without sending the same event twice, and rows are only deleted once ws-backend accepted
+    them. The relay wakes up right after a local tracker change and polls every ``poll_interval``
+    seconds for events left by other workers or before a restart.
+
+    Events of a user are delivered in order: a relay leaves them in the outbox while another relay
+    still holds an older event of the same user. Events for the same user and activity within a
+    batch are coalesced into the latest one.
+    Failed POSTs are retried with exponential backoff, after which the batch stays in the outbox
+    for the next poll.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        client_factory: Callable[[], httpx.AsyncClient] = get_ws_client,
+        window: float = settings.LIVE_STATUS_COALESCE_WINDOW,
+        poll_interval: float = settings.LIVE_STATUS_POLL_INTERVAL,
+        batch_size: int = settings.LIVE_STATUS_BATCH_SIZE,
+        max_retries: int = settings.LIVE_STATUS_MAX_RETRIES,
+        retry_backoff: float = settings.LIVE_STATUS_RETRY_BACKOFF,
+    ):
+        self.session_factory = session_factory
+        self.client_factory = client_factory
+        self.window = window
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+        self.backlog = 0
+        self.batches_sent = 0
+        self.events_sent = 0
+        self.last_batch_size = 0
+        self.send_seconds_total = 0.0
+        self.send_seconds_max = 0.0
+        self.retries = 0
+        self.batches_failed = 0
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # undelivered events stay in the outbox for the next start
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def flush(self) -> None:
+        """Relay batches until the outbox is drained or ws-backend keeps failing."""
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(func.count()).select_from(OutboxEvent).where(OutboxEvent.topic == LIVE_STATUS_TOPIC)
+            )
+            self.backlog = result.scalar_one()
+
+        while self.backlog:
+            relayed = await self.relay_batch()
+            self.backlog = max(self.backlog - relayed, 0)
+            if relayed < self.batch_size:
+                break
+
+    async def _claim(self, session: AsyncSession) -> list[OutboxEvent]:
+        result = await session.execute(
+            select(OutboxEvent)
+            .where(OutboxEvent.topic == LIVE_STATUS_TOPIC)
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars().all())
+
+    async def _in_user_order(self, session: AsyncSession, rows: list[OutboxEvent]) -> list[OutboxEvent]:
+        """Drop the claimed events of users with an older event that another relay claimed.
+
+        Every older event that is not in ``rows`` was skipped as locked, so there are at most as many as
+        the other relays claimed. The dropped events stay in the outbox until that relay delivered its own.
+        """
+        result = await session.execute(
+            select(OutboxEvent.id, OutboxEvent.payload).where(
+                OutboxEvent.topic == LIVE_STATUS_TOPIC,
+                OutboxEvent.id < rows[-1].id,
+                OutboxEvent.id.not_in([row.id for row in rows]),
+            )
+        )
+        blocked = {}
+        for event_id, payload in result:
+            blocked[payload["user_id"]] = min(event_id, blocked.get(payload["user_id"], event_id))
+        return [row for row in rows if row.id < blocked.get(row.payload["user_id"], row.id + 1)]
+
+    async def relay_batch(self) -> int:
+        """Deliver one batch of outbox events and return how many were delivered."""
+        async with self.session_factory() as session:
+            rows = await self._claim(session)
+            if rows:
+                rows = await self._in_user_order(session, rows)
+            if not rows:
+                return 0
+
+            events = {}
+            for row in rows:
+                for event in _events_from_payload(row.payload):
+                    # re-insert, so a coalesced event keeps its place after the events it superseded
+                    events.pop((event.user_id, event.activity_id), None)
+                    events[(event.user_id, event.activity_id)] = event
+
+            updates = await build_live_status_updates(session, events.values())
+            if not await self._post(updates):
+                # closing the session rolls back and releases the rows for the next attempt
+                return 0
+
+            await session.execute(delete(OutboxEvent).where(OutboxEvent.id.in_([row.id for row in rows])))
+            await session.commit()
+
+        self.last_batch_size = len(rows)
+        self.events_sent += len(rows)
+        return len(rows)
+
+    async def _post(self, updates: list[dict]) -> bool:
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client_factory().post("/api/notify", json=updates)
+                response.raise_for_status()
+                break
+            except httpx.HTTPError as e:
+                if attempt == self.max_retries:
+                    self.batches_failed += 1
+                    logger.warning("Live status batch left in the outbox, ws-backend failed: %s", e)
+                    return False
+                self.retries += 1
+                await asyncio.sleep(self.retry_backoff * 2**attempt)
+
+        elapsed = time.perf_counter() - start
+        self.batches_sent += 1
+        self.send_seconds_total += elapsed
+        self.send_seconds_max = max(self.send_seconds_max, elapsed)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            await asyncio.sleep(self.window)  # let quick successive updates coalesce
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Live status relay failed")
+
+    def stats(self) -> dict:
+        return {
+            "backlog": self.backlog,
+            "batches_sent": self.batches_sent,
+            "events_sent": self.events_sent,
+            "last_batch_size": self.last_batch_size,
+            "send_seconds_total": self.send_seconds_total,
+            "send_seconds_max": self.send_seconds_max,
+            "retries": self.retries,
+            "batches_failed": self.batches_failed,
+        }
+
+
+live_status_dispatcher = LiveStatusDispatcher()
+register_collector("live_status_dispatcher", live_status_dispatcher.stats)
+# outbox rows committed by other workers wake this relay too, so the poll is only a fallback
+change_listener.subscribe("outbox", lambda _: live_status_dispatcher.wake())
+
+
+def wake_live_status_relay() -> None:
+    """Have this worker's relay deliver freshly committed events without waiting for the next poll."""
+    live_status_dispatcher.wake()
@@ -1,58 +1,141 @@
+import hashlib
 from uuid import UUID
 
-from sqlalchemy import select
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.models.active_activity import ActiveActivity
 from app.models.mapping import ActivityObjectiveMapping
-from app.models.room import RoomMember
-from app.services.room_service import get_rooms
+from app.models.room import Room, RoomMember
 
 
-async def get_live_status_for_user_rooms(session: AsyncSession, user_id: UUID) -> dict:
-    # get all rooms the user is a member of
-    user_rooms = await get_rooms(session, user_id)
-    room_ids = [room.id for room in user_rooms]
-
-    if not room_ids:
-        return {}
-
-    # get all members of these rooms
-    members_res = await session.execute(select(RoomMember.user_id).where(RoomMember.room_id.in_(room_ids)))
-    member_ids = list(members_res.scalars().unique())
-
-    # get all active trackers for these members
-    active_res = await session.execute(
-        select(ActiveActivity)
-        .where(ActiveActivity.user_id.in_(member_ids))
-        .options(selectinload(ActiveActivity.activity))
+def mapped_rooms(user_id: UUID, activity_id: UUID) -> Select:
+    return select(ActivityObjectiveMapping.room_id).where(
+        ActivityObjectiveMapping.user_id == user_id, ActivityObjectiveMapping.activity_id == activity_id
+    )
+
+
+async def bump_live_version(session: AsyncSession, room_ids) -> None:
+    """Marks the live status of the given rooms (ids or a subquery of them) as changed.
+
+    Call it after locking the activities or members involved and before writing leaderboard entries,
+    so rows are locked in the same order everywhere (see leaderboard_service).
+    """
+    await session.execute(
+        update(Room)
+        .where(Room.id.in_(room_ids))
+        .values(live_version=Room.live_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _live_trackers() -> Select:
+    # one row per (room, live member, objective): the join starts from the active trackers and
+    # follows the (user_id, activity_id) mapping index, so the cost grows with live trackers only
+    return (
+        select(
+            ActivityObjectiveMapping.room_id,
+            ActiveActivity.user_id,
+            ActivityObjectiveMapping.objective_id,
+            ActiveActivity.start_time,
+        )
+        .select_from(ActiveActivity)
+        .join(
+            ActivityObjectiveMapping,
+            and_(
+                ActivityObjectiveMapping.user_id == ActiveActivity.user_id,
+                ActivityObjectiveMapping.activity_id == ActiveActivity.activity_id,
+            ),
+        )
     )
-    active_trackers = active_res.scalars().all()
 
-    # get all relevant mappings for these rooms
-    mappings_res = await session.execute(
-        select(ActivityObjectiveMapping).where(ActivityObjectiveMapping.room_id.in_(room_ids))
+
+async def get_live_status_for_user_rooms(session: AsyncSession, user_id: UUID) -> dict:
+    result = await session.execute(
+        _live_trackers().join(
+            RoomMember,
+            and_(RoomMember.room_id == ActivityObjectiveMapping.room_id, RoomMember.user_id == user_id),
+        )
     )
-    mappings = mappings_res.scalars().all()
 
     # build the live status dictionary
     live_status = {}
-    for tracker in active_trackers:
-        # find which rooms this activity is mapped in
-        for mapping in mappings:
-            if mapping.activity_id == tracker.activity_id and mapping.user_id == tracker.user_id:
-                room_id_str = str(mapping.room_id)
-                user_id_str = str(tracker.user_id)
-                objective_id_str = str(mapping.objective_id)
-
-                if room_id_str not in live_status:
-                    live_status[room_id_str] = {}
-                if user_id_str not in live_status[room_id_str]:
-                    live_status[room_id_str][user_id_str] = []
-
-                live_status[room_id_str][user_id_str].append(
-                    {"objectiveId": objective_id_str, "startTime": tracker.start_time.isoformat()}
-                )
+    for room_id, tracker_user_id, objective_id, start_time in result:
+        live_status.setdefault(str(room_id), {}).setdefault(str(tracker_user_id), []).append(
+            {"objectiveId": str(objective_id), "startTime": start_time.isoformat()}
+        )
+
+    return live_status
+
+
+async def get_live_versions(session: AsyncSession, user_id: UUID) -> dict[UUID, int]:
+    """Live version of every room of the user."""
+    result = await session.execute(
+        select(Room.id, Room.live_version)
+        .join(RoomMember, RoomMember.room_id == Room.id)
+        .where(RoomMember.user_id == user_id)
+        .order_by(Room.id)
+    )
+    return dict(result.all())
+
 
+def live_status_etag(versions: dict[UUID, int]) -> str:
+    """Changes whenever the live status of the user's rooms, or the set of rooms, changes."""
+    digest = hashlib.blake2b(digest_size=8)
+    for room_id, live_version in versions.items():
+        digest.update(f"{room_id}:{live_version};".encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def format_live_versions(versions: dict[UUID, int]) -> str:
+    return ",".join(f"{room_id}:{live_version}" for room_id, live_version in versions.items())
+
+
+def parse_live_versions(since: str) -> dict[UUID, int]:
+    """Inverse of ``format_live_versions``; an empty cursor knows no rooms yet."""
+    try:
+        return {
+            UUID(room_id): int(live_version)
+            for room_id, live_version in (item.split(":") for item in since.split(",") if item)
+        }
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid since cursor") from None
+
+
+async def get_live_status_changes(session: AsyncSession, versions: dict[UUID, int], since: dict[UUID, int]) -> dict:
+    """Live status of the rooms whose version moved past ``since``, plus a cursor for the next poll.
+
+    ``versions`` must be read before calling this, so a change in between is picked up by the next poll.
+    """
+    changed = [room_id for room_id, live_version in versions.items() if since.get(room_id) != live_version]
+    result = await session.execute(_live_trackers().where(ActivityObjectiveMapping.room_id.in_(changed)))
+
+    # rooms without live members are reported too, so clients can clear them
+    rooms = {str(room_id): {} for room_id in changed}
+    for room_id, tracker_user_id, objective_id, start_time in result:
+        rooms[str(room_id)].setdefault(str(tracker_user_id), []).append(
+            {"objectiveId": str(objective_id), "startTime": start_time.isoformat()}
+        )
+
+    return {
+        "since": format_live_versions(versions),
+        "rooms": rooms,
+        "removed": [str(room_id) for room_id in since.keys() - versions.keys()],
+    }
+
+
+async def get_room_live_version(session: AsyncSession, room_id: UUID) -> int:
+    result = await session.execute(select(Room.live_version).where(Room.id == room_id))
+    return result.scalar_one()
+
+
+async def get_room_live_status(session: AsyncSession, room_id: UUID) -> dict:
+    result = await session.execute(_live_trackers().where(ActivityObjectiveMapping.room_id == room_id))
+
+    live_status = {}
+    for _, tracker_user_id, objective_id, start_time in result:
+        live_status.setdefault(str(tracker_user_id), []).append(
+            {"objectiveId": str(objective_id), "startTime": start_time.isoformat()}
+        )
     return live_status
@@ -0,0 +1,169 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import register_collector
+from app.database.pubsub import change_listener
+from app.models.active_activity import ActiveActivity
+from app.models.mapping import ActivityObjectiveMapping
+from app.models.room import RoomMember
+
+# tells a stream that it missed changes and the client has to reconnect for a fresh snapshot
+RESYNC = {"op": "RESYNC"}
+
+
+class LiveStatusHub:
+    """Fans tracker changes from the change listener out to the open live-status streams of this worker."""
+
+    def __init__(self, queue_size: int = settings.LIVE_STATUS_STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._queues: set[asyncio.Queue] = set()
+        self.resyncs = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(self.queue_size)
+        self._queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._queues.discard(queue)
+
+    def publish(self, change: dict) -> None:
+        if change["op"] == "RESET":
+            change = RESYNC
+        for queue in self._queues:
+            try:
+                queue.put_nowait(change)
+            except asyncio.QueueFull:
+                # the client cannot keep up: drop its backlog and make it start over
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+                self.resyncs += 1
+
+    def stats(self) -> dict:
+        return {"streams": len(self._queues), "resyncs": self.resyncs}
+
+
+live_status_hub = LiveStatusHub()
+register_collector("live_status_stream", live_status_hub.stats)
+change_listener.subscribe("active_activities", live_status_hub.publish)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class LiveStatusStream:
+    """Live state of a user's rooms, kept current from tracker changes."""
+
+    def __init__(self, mappings: dict[tuple[UUID, UUID], list[tuple[UUID, UUID]]], active: dict[UUID, tuple]):
+        self.mappings = mappings  # (user_id, activity_id) -> [(room_id, objective_id)]
+        self.active = active  # user_id -> (activity_id, start_time)
+        self.user_ids = {user_id for user_id, _ in mappings}
+
+    def snapshot(self) -> dict:
+        """Same shape as ``get_live_status_for_user_rooms``."""
+        live_status = {}
+        for user_id, (activity_id, start_time) in self.active.items():
+            for room_id, objective_id in self.mappings.get((user_id, activity_id), []):
+                live_status.setdefault(str(room_id), {}).setdefault(str(user_id), []).append(
+                    {"objectiveId": str(objective_id), "startTime": start_time}
+                )
+        return live_status
+
+    def deltas(self, change: dict) -> list[dict]:
+        """Per-objective updates, shaped like the ws-backend ones, for one ``active_activities`` change."""
+        user_id = UUID(change["user_id"])
+        if user_id not in self.user_ids:
+            return []
+
+        updates = []
+        previous = self.active.pop(user_id, None)
+        activity_id = UUID(change["activity_id"])
+        if previous and (change["op"] == "DELETE" or previous[0] != activity_id):
+            updates += self._updates(user_id, previous[0], False, None)
+        if change["op"] == "DELETE":
+            if not previous:
+                updates += self._updates(user_id, activity_id, False, None)
+        else:
+            self.active[user_id] = (activity_id, change["start_time"])
+            updates += self._updates(user_id, activity_id, True, change["start_time"])
+        return updates
+
+    def _updates(self, user_id: UUID, activity_id: UUID, live: bool, start_time: str | None) -> list[dict]:
+        return [
+            {
+                "userId": str(user_id),
+                "roomId": str(room_id),
+                "objectiveId": str(objective_id),
+                "live": live,
+                "startTime": start_time,
+            }
+            for room_id, objective_id in self.mappings.get((user_id, activity_id), [])
+        ]
+
+    async def events(self, queue: asyncio.Queue, keepalive: float = settings.LIVE_STATUS_STREAM_KEEPALIVE):
+        """Server-sent events: the snapshot, then a delta per change, until a resync is needed."""
+        try:
+            yield _sse("snapshot", self.snapshot())
+            while True:
+                try:
+                    change = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if change is RESYNC:
+                    yield _sse("resync", {})
+                    return
+                for delta in self.deltas(change):
+                    yield _sse("delta", delta)
+        finally:
+            live_status_hub.unsubscribe(queue)
+
+
+async def open_live_status_stream(session: AsyncSession, user_id: UUID) -> LiveStatusStream:
+    """Load what a stream needs up front, so it holds no database connection while open.
+
+    Mapping changes made while the stream is open show up after the client reconnects.
+    """
+    result = await session.execute(
+        select(
+            ActivityObjectiveMapping.user_id,
+            ActivityObjectiveMapping.activity_id,
+            ActivityObjectiveMapping.room_id,
+            ActivityObjectiveMapping.objective_id,
+        )
+        .join(RoomMember, RoomMember.room_id == ActivityObjectiveMapping.room_id)
+        .where(RoomMember.user_id == user_id)
+    )
+    mappings = {}
+    for mapped_user_id, activity_id, room_id, objective_id in result:
+        mappings.setdefault((mapped_user_id, activity_id), []).append((room_id, objective_id))
+
+    result = await session.execute(
+        select(ActiveActivity.user_id, ActiveActivity.activity_id, ActiveActivity.start_time).where(
+            ActiveActivity.user_id.in_({mapped_user_id for mapped_user_id, _ in mappings})
+        )
+    )
+    active = {
+        tracker_user_id: (activity_id, start_time.isoformat()) for tracker_user_id, activity_id, start_time in result
+    }
+    return LiveStatusStream(mappings, active)
+
+
+async def stream_live_status(session: AsyncSession, user_id: UUID) -> AsyncIterator[str]:
+    # subscribe before loading, so no change between the snapshot and the first delta is lost
+    queue = live_status_hub.subscribe()
+    try:
+        stream = await open_live_status_stream(session, user_id)
+    except BaseException:
+        live_status_hub.unsubscribe(queue)
+        raise
+    return stream.events(queue)
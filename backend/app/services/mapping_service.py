@@ -1,55 +1,81 @@
-from uuid import UUID
+from collections.abc import Iterable
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import and_, delete, literal, or_, select, true, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database.upsert import dialect_insert
+from app.models.activity import Activity
 from app.models.mapping import ActivityObjectiveMapping
 from app.models.room import RoomMember
+from app.services.leaderboard_service import rebuild_member_leaderboard
+from app.services.live_status_service import bump_live_version
+from app.services.room_service import invalidate_room_access, verify_room_member
 
 
-async def update_mapping(
-    session: AsyncSession, room_id: UUID, user_id: UUID, activity_id: UUID, objective_id: UUID, weight: float = 1.0
-) -> ActivityObjectiveMapping:
-    # verify membership
+async def _lock_member_activity(session: AsyncSession, room_id: UUID, user_id: UUID, activity_id: UUID) -> None:
+    await verify_room_member(session, room_id, user_id)
+
+    # verify activity belongs to user, locking it against concurrent log writes
+    # and the member against concurrent leaderboard rebuilds
     result = await session.execute(
-        select(RoomMember).where(RoomMember.room_id == room_id, RoomMember.user_id == user_id)
+        select(Activity.id)
+        .join(RoomMember, and_(RoomMember.room_id == room_id, RoomMember.user_id == Activity.user_id))
+        .where(Activity.id == activity_id, Activity.user_id == user_id)
+        .with_for_update()
     )
     if not result.scalar_one_or_none():
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this room")
+        # the member may have been removed since the access was cached
+        invalidate_room_access(room_id)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
 
-    result = await session.execute(
-        select(ActivityObjectiveMapping).where(
-            ActivityObjectiveMapping.room_id == room_id,
-            ActivityObjectiveMapping.user_id == user_id,
-            ActivityObjectiveMapping.activity_id == activity_id,
-            ActivityObjectiveMapping.objective_id == objective_id,
+
+async def _member_activity_not_found(session: AsyncSession, room_id: UUID, user_id: UUID) -> HTTPException:
+    await verify_room_member(session, room_id, user_id)
+    # the member may have been removed since the access was cached
+    invalidate_room_access(room_id)
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
+
+
+async def update_mapping(
+    session: AsyncSession, room_id: UUID, user_id: UUID, activity_id: UUID, objective_id: UUID, weight: float = 1.0
+) -> ActivityObjectiveMapping:
+    # one statement: inserts or updates the mapping only if the user owns the activity and is a room
+    # member, locking both like _lock_member_activity does
+    stmt = dialect_insert(session, ActivityObjectiveMapping).from_select(
+        ["room_id", "user_id", "activity_id", "objective_id", "weight"],
+        select(
+            RoomMember.room_id,
+            RoomMember.user_id,
+            Activity.id,
+            literal(objective_id, ActivityObjectiveMapping.objective_id.type),
+            literal(weight, ActivityObjectiveMapping.weight.type),
         )
+        .join(RoomMember, and_(RoomMember.room_id == room_id, RoomMember.user_id == Activity.user_id))
+        .where(Activity.id == activity_id, Activity.user_id == user_id)
+        .with_for_update(),
     )
-    mapping = result.scalar_one_or_none()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["room_id", "user_id", "activity_id", "objective_id"], set_={"weight": stmt.excluded.weight}
+    )
+    mapping = await session.scalar(
+        stmt.returning(ActivityObjectiveMapping), execution_options={"populate_existing": True}
+    )
+    if not mapping:
+        raise await _member_activity_not_found(session, room_id, user_id)
 
-    if mapping:
-        mapping.weight = weight
-    else:
-        mapping = ActivityObjectiveMapping(
-            room_id=room_id, user_id=user_id, activity_id=activity_id, objective_id=objective_id, weight=weight
-        )
-        session.add(mapping)
+    await bump_live_version(session, [room_id])
+    await rebuild_member_leaderboard(session, room_id, user_id, objective_id)
 
     await session.commit()
-    await session.refresh(mapping)
     return mapping
 
 
 async def delete_mapping(
     session: AsyncSession, room_id: UUID, user_id: UUID, activity_id: UUID, objective_id: UUID
 ) -> None:
-    # verify membership
-    result = await session.execute(
-        select(RoomMember).where(RoomMember.room_id == room_id, RoomMember.user_id == user_id)
-    )
-    if not result.scalar_one_or_none():
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this room")
+    await _lock_member_activity(session, room_id, user_id, activity_id)
 
     result = await session.execute(
         select(ActivityObjectiveMapping).where(
@@ -65,6 +91,9 @@ async def delete_mapping(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mapping not found")
 
     await session.delete(mapping)
+    await session.flush()
+    await bump_live_version(session, [room_id])
+    await rebuild_member_leaderboard(session, room_id, user_id, objective_id)
     await session.commit()
 
 
@@ -75,3 +104,83 @@ async def get_mappings(session: AsyncSession, room_id: UUID, user_id: UUID) -> l
         )
     )
     return list(result.scalars().all())
+
+
+async def update_mappings(
+    session: AsyncSession,
+    room_id: UUID,
+    user_id: UUID,
+    upserts: dict[tuple[UUID, UUID], float],
+    deletes: Iterable[tuple[UUID, UUID]] = (),
+    replace: bool = False,
+) -> list[ActivityObjectiveMapping]:
+    """Apply many mapping changes of a member in one transaction and return their mappings in the room.
+
+    ``upserts`` maps (activity_id, objective_id) pairs to weights. With ``replace`` they are the member's
+    complete mapping set and every other mapping is deleted, otherwise only the ``deletes`` are.
+    Deletes run first, so a pair both deleted and upserted ends up mapped.
+    """
+    await verify_room_member(session, room_id, user_id)
+    deletes = set(deletes)
+    member_mappings = and_(ActivityObjectiveMapping.room_id == room_id, ActivityObjectiveMapping.user_id == user_id)
+
+    # lock every activity involved against concurrent log writes, and the member against rebuilds
+    involved = Activity.id.in_({activity_id for activity_id, _ in upserts.keys() | deletes})
+    if replace:
+        involved = or_(involved, Activity.id.in_(select(ActivityObjectiveMapping.activity_id).where(member_mappings)))
+    result = await session.execute(
+        select(Activity.id)
+        .join(RoomMember, and_(RoomMember.room_id == room_id, RoomMember.user_id == Activity.user_id))
+        .where(Activity.user_id == user_id, involved)
+        .with_for_update()
+    )
+    if not set(result.scalars()) >= {activity_id for activity_id, _ in upserts}:
+        invalidate_room_access(room_id)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
+
+    changed_objectives = {objective_id for _, objective_id in upserts}
+    pair = tuple_(ActivityObjectiveMapping.activity_id, ActivityObjectiveMapping.objective_id)
+    to_delete = None
+    if replace:
+        to_delete = pair.not_in(upserts.keys()) if upserts else true()
+    elif deletes:
+        to_delete = pair.in_(deletes)
+    if to_delete is not None:
+        result = await session.execute(
+            delete(ActivityObjectiveMapping)
+            .where(member_mappings, to_delete)
+            .returning(ActivityObjectiveMapping.objective_id)
+        )
+        changed_objectives.update(result.scalars())
+
+    if upserts:
+        stmt = dialect_insert(session, ActivityObjectiveMapping).values(
+            [
+                {
+                    "id": uuid4(),
+                    "room_id": room_id,
+                    "user_id": user_id,
+                    "activity_id": activity_id,
+                    "objective_id": objective_id,
+                    "weight": weight,
+                }
+                for (activity_id, objective_id), weight in upserts.items()
+            ]
+        )
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["room_id", "user_id", "activity_id", "objective_id"],
+                set_={"weight": stmt.excluded.weight},
+            )
+        )
+
+    if changed_objectives:
+        await bump_live_version(session, [room_id])
+        await rebuild_member_leaderboard(session, room_id, user_id, *changed_objectives)
+
+    result = await session.scalars(
+        select(ActivityObjectiveMapping).where(member_mappings), execution_options={"populate_existing": True}
+    )
+    mappings = list(result.all())
+    await session.commit()
+    return mappings
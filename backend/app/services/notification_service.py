@@ -1,64 +1,91 @@
+from collections.abc import Iterable
 from datetime import datetime
+from typing import NamedTuple
 from uuid import UUID
 
 import httpx
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.models.mapping import ActivityObjectiveMapping
 
+_ws_client: httpx.AsyncClient | None = None
 
-async def notify_live_status(
-    session: AsyncSession,
-    user_id: UUID,
-    activity_id: UUID | None,
-    active: bool,
-    start_time: datetime | None = None,
-):
-    if not activity_id:
-        return
+
+class LiveStatusEvent(NamedTuple):
+    user_id: UUID
+    activity_id: UUID
+    active: bool
+    start_time: datetime | None = None
+
+
+def get_ws_client() -> httpx.AsyncClient:
+    """Client shared by all ws-backend calls of this worker, so connections are kept alive between calls."""
+    global _ws_client
+    if _ws_client is None or _ws_client.is_closed:
+        _ws_client = httpx.AsyncClient(
+            base_url=settings.WS_BACKEND_URL,
+            headers={"Authorization": f"Bearer {settings.SECRET_KEY}"},
+            timeout=httpx.Timeout(settings.WS_BACKEND_TIMEOUT, connect=settings.WS_BACKEND_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.WS_BACKEND_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WS_BACKEND_MAX_CONNECTIONS,
+            ),
+        )
+    return _ws_client
+
+
+async def close_ws_client() -> None:
+    global _ws_client
+    if _ws_client is not None:
+        await _ws_client.aclose()
+        _ws_client = None
+
+
+async def build_live_status_updates(session: AsyncSession, events: Iterable[LiveStatusEvent]) -> list[dict]:
+    """ws-backend updates for tracker events: one per room objective the activity is mapped to,
+    plus one personal update per user (for dashboard sync) reflecting their latest event."""
+    events = list(events)
+    if not events:
+        return []
 
     result = await session.execute(
-        select(ActivityObjectiveMapping).where(
-            ActivityObjectiveMapping.user_id == user_id,
-            ActivityObjectiveMapping.activity_id == activity_id,
+        select(
+            ActivityObjectiveMapping.user_id,
+            ActivityObjectiveMapping.activity_id,
+            ActivityObjectiveMapping.room_id,
+            ActivityObjectiveMapping.objective_id,
+        ).where(
+            tuple_(ActivityObjectiveMapping.user_id, ActivityObjectiveMapping.activity_id).in_(
+                {(event.user_id, event.activity_id) for event in events}
+            )
         )
     )
-    mappings = result.scalars().all()
+    mappings = {}
+    for user_id, activity_id, room_id, objective_id in result:
+        mappings.setdefault((user_id, activity_id), []).append((room_id, objective_id))
 
     updates = []
-    for m in mappings:
-        updates.append(
-            {
-                "userId": str(user_id),
-                "roomId": str(m.room_id),
-                "objectiveId": str(m.objective_id),
-                "live": active,
-                "startTime": start_time.isoformat() if start_time else None,
-            }
-        )
-
-    # always notify the user personally (for dashboard sync)
-    updates.append(
-        {
-            "userId": str(user_id),
+    personal = {}
+    for event in events:
+        start_time = event.start_time.isoformat() if event.start_time else None
+        for room_id, objective_id in mappings.get((event.user_id, event.activity_id), []):
+            updates.append(
+                {
+                    "userId": str(event.user_id),
+                    "roomId": str(room_id),
+                    "objectiveId": str(objective_id),
+                    "live": event.active,
+                    "startTime": start_time,
+                }
+            )
+        personal[event.user_id] = {
+            "userId": str(event.user_id),
             "roomId": None,
             "objectiveId": None,
-            "live": active,
-            "startTime": start_time.isoformat() if start_time else None,
+            "live": event.active,
+            "startTime": start_time,
         }
-    )
-
-    if not updates:
-        return
 
-    try:
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                f"{settings.WS_BACKEND_URL}/api/notify",
-                json=updates,
-                headers={"Authorization": f"Bearer {settings.SECRET_KEY}"},
-            )
-    except Exception as e:
-        print(f"Failed to notify ws-backend: {e}")
+    return updates + list(personal.values())
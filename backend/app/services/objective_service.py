@@ -6,14 +6,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schema.room import ObjectiveCreate, ObjectiveGroupCreate, ObjectiveUpdate
+from app.database.write import save
 from app.models.room import Objective, ObjectiveGroup
 
 
 async def create_objective(session: AsyncSession, room_id: UUID, objective_in: ObjectiveCreate) -> Objective:
     objective = Objective(**objective_in.model_dump(), room_id=room_id)
-    session.add(objective)
-    await session.commit()
-    await session.refresh(objective)
+    await save(session, objective)
     return objective
 
 
@@ -39,9 +38,7 @@ async def update_objective(session: AsyncSession, objective_id: UUID, objective_
     for key, value in update_data.items():
         setattr(objective, key, value)
 
-    session.add(objective)
-    await session.commit()
-    await session.refresh(objective)
+    await save(session, objective)
     return objective
 
 
@@ -49,9 +46,7 @@ async def create_objective_group(
     session: AsyncSession, room_id: UUID, group_in: ObjectiveGroupCreate
 ) -> ObjectiveGroup:
     group = ObjectiveGroup(**group_in.model_dump(), room_id=room_id)
-    session.add(group)
-    await session.commit()
-    await session.refresh(group)
+    await save(session, group)
     return group
 
 
@@ -90,7 +85,5 @@ async def update_objective_group(
     for key, value in update_data.items():
         setattr(group, key, value)
 
-    session.add(group)
-    await session.commit()
-    await session.refresh(group)
+    await save(session, group)
     return group
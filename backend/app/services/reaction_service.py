@@ -3,6 +3,7 @@ from uuid import UUID
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database.write import save
 from app.models.mapping import Reaction
 
 
@@ -10,9 +11,7 @@ async def add_reaction(
     session: AsyncSession, room_id: UUID, sender_id: UUID, receiver_id: UUID, emoji: str
 ) -> Reaction:
     reaction = Reaction(room_id=room_id, sender_id=sender_id, receiver_id=receiver_id, emoji=emoji)
-    session.add(reaction)
-    await session.commit()
-    await session.refresh(reaction)
+    await save(session, reaction)
     return reaction
 
 
@@ -0,0 +1,51 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.upsert import dialect_insert
+from app.models.activity import Activity, ActivityDailyTotal
+from app.services.leaderboard_service import add_minutes_to_leaderboards
+
+
+async def lock_logged_activities(session: AsyncSession, activity_ids: Iterable[UUID]) -> None:
+    """Serialize with mapping changes of these activities (see leaderboard_service).
+
+    Callers that also bump live versions must take this lock first.
+    """
+    await session.execute(
+        select(Activity.id).where(Activity.id.in_(sorted(set(activity_ids)))).with_for_update(read=True, key_share=True)
+    )
+
+
+async def add_logged_minutes(session: AsyncSession, logs: Iterable[tuple[UUID, date, int]], lock: bool = True) -> None:
+    """Add ``(activity_id, day, minutes)`` entries to the daily rollup and leaderboards within the caller's transaction.
+
+    Pass ``lock=False`` when the activities were already locked with ``lock_logged_activities``.
+    """
+    totals = defaultdict(int)
+    for activity_id, day, minutes in logs:
+        totals[(activity_id, day)] += minutes
+
+    rows = [
+        {"activity_id": activity_id, "day": day, "minutes": minutes}
+        for (activity_id, day), minutes in totals.items()
+        if minutes
+    ]
+    if not rows:
+        return
+
+    if lock:
+        await lock_logged_activities(session, (row["activity_id"] for row in rows))
+
+    stmt = dialect_insert(session, ActivityDailyTotal).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ActivityDailyTotal.activity_id, ActivityDailyTotal.day],
+        set_={"minutes": ActivityDailyTotal.minutes + stmt.excluded.minutes},
+    )
+    await session.execute(stmt)
+
+    await add_minutes_to_leaderboards(session, {(row["activity_id"], row["day"]): row["minutes"] for row in rows})
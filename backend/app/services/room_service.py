@@ -1,12 +1,22 @@
+from typing import NamedTuple
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schema.room import RoomCreate
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import register_collector
+from app.database.pubsub import change_listener
+from app.database.write import save
+from app.models.leaderboard import LeaderboardEntry
+from app.models.mapping import ActivityObjectiveMapping
 from app.models.room import Room, RoomMember
 from app.models.user import ResolutionEnum, UserSettings
+from app.services.live_status_service import bump_live_version
 
 RESOLUTION_HIERARCHY = {
     ResolutionEnum.DAY: 0,
@@ -16,6 +26,48 @@ RESOLUTION_HIERARCHY = {
 }
 
 
+class RoomAccess(NamedTuple):
+    admin_id: UUID
+    member_ids: frozenset[UUID]
+
+
+room_access_cache = TTLCache(ttl=settings.ROOM_ACCESS_CACHE_TTL, maxsize=settings.ROOM_ACCESS_CACHE_SIZE)
+register_collector("room_access_cache", room_access_cache.stats)
+
+
+def invalidate_room_access(room_id: UUID) -> None:
+    """Drop the cached access of a room after its members change or the room is deleted."""
+    room_access_cache.invalidate(room_id)
+
+
+def _on_room_change(change: dict) -> None:
+    if change["op"] == "RESET":
+        room_access_cache.clear()
+    else:
+        invalidate_room_access(UUID(change["room_id"] if change["table"] == "room_members" else change["id"]))
+
+
+change_listener.subscribe("rooms", _on_room_change)
+change_listener.subscribe("room_members", _on_room_change)
+
+
+async def get_room_access(session: AsyncSession, room_id: UUID) -> RoomAccess | None:
+    access = room_access_cache.get(room_id)
+    if access is not None:
+        return access
+
+    result = await session.execute(
+        select(Room.admin_id, RoomMember.user_id).outerjoin(RoomMember).where(Room.id == room_id)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+
+    access = RoomAccess(rows[0].admin_id, frozenset(row.user_id for row in rows if row.user_id))
+    room_access_cache.set(room_id, access)
+    return access
+
+
 async def create_room(session: AsyncSession, room_in: RoomCreate, user_id: UUID) -> Room:
     # check limit of 100 rooms per admin
     result = await session.execute(select(func.count()).select_from(Room).where(Room.admin_id == user_id))
@@ -27,11 +79,7 @@ async def create_room(session: AsyncSession, room_in: RoomCreate, user_id: UUID)
     session.add(room)
     await session.flush()
 
-    member = RoomMember(room_id=room.id, user_id=user_id)
-    session.add(member)
-
-    await session.commit()
-    await session.refresh(room)
+    await save(session, RoomMember(room_id=room.id, user_id=user_id))
     return room
 
 
@@ -45,13 +93,20 @@ async def get_room(session: AsyncSession, room_id: UUID) -> Room | None:
     return result.scalar_one_or_none()
 
 
-async def verify_room_admin(session: AsyncSession, room_id: UUID, user_id: UUID) -> Room:
-    room = await get_room(session, room_id)
-    if not room:
+async def verify_room_admin(session: AsyncSession, room_id: UUID, user_id: UUID) -> RoomAccess:
+    access = await get_room_access(session, room_id)
+    if not access:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found")
-    if room.admin_id != user_id:
+    if access.admin_id != user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    return room
+    return access
+
+
+async def verify_room_member(session: AsyncSession, room_id: UUID, user_id: UUID) -> RoomAccess:
+    access = await get_room_access(session, room_id)
+    if not access or user_id not in access.member_ids:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this room")
+    return access
 
 
 async def join_room(session: AsyncSession, room_id: UUID, user_id: UUID) -> RoomMember:
@@ -59,11 +114,8 @@ async def join_room(session: AsyncSession, room_id: UUID, user_id: UUID) -> Room
     if not room:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found")
 
-    # check if already member
-    result = await session.execute(
-        select(RoomMember).where(RoomMember.room_id == room_id, RoomMember.user_id == user_id)
-    )
-    if result.scalar_one_or_none():
+    access = await get_room_access(session, room_id)
+    if user_id in access.member_ids:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already a member")
 
     result = await session.execute(select(UserSettings).where(UserSettings.user_id == user_id))
@@ -81,6 +133,40 @@ async def join_room(session: AsyncSession, room_id: UUID, user_id: UUID) -> Room
 
     member = RoomMember(room_id=room_id, user_id=user_id)
     session.add(member)
-    await session.commit()
-    await session.refresh(member)
+    try:
+        await session.commit()
+    except IntegrityError as e:
+        # joined through another worker since the access was cached
+        await session.rollback()
+        invalidate_room_access(room_id)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already a member") from e
+    invalidate_room_access(room_id)
+
     return member
+
+
+async def remove_member(session: AsyncSession, room_id: UUID, user_id: UUID) -> None:
+    access = await get_room_access(session, room_id)
+    if access and access.admin_id == user_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot remove the room admin")
+
+    # lock the member against concurrent mapping changes and leaderboard rebuilds
+    result = await session.execute(
+        select(RoomMember).where(RoomMember.room_id == room_id, RoomMember.user_id == user_id).with_for_update()
+    )
+    member = result.scalar_one_or_none()
+    if not member:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found")
+
+    await bump_live_version(session, [room_id])
+    await session.execute(
+        delete(ActivityObjectiveMapping).where(
+            ActivityObjectiveMapping.room_id == room_id, ActivityObjectiveMapping.user_id == user_id
+        )
+    )
+    await session.execute(
+        delete(LeaderboardEntry).where(LeaderboardEntry.room_id == room_id, LeaderboardEntry.user_id == user_id)
+    )
+    await session.delete(member)
+    await session.commit()
+    invalidate_room_access(room_id)
@@ -1,46 +1,56 @@
 from datetime import date
 from uuid import UUID
 
-from sqlalchemy import func, select
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from app.database.periods import period_start
 from app.models.active_activity import ActiveActivity
-from app.models.activity import Activity, ActivityLog
+from app.models.activity import Activity, ActivityDailyTotal, ResolutionEnum
 from app.models.mapping import ActivityObjectiveMapping
-from app.models.room import RoomMember
+from app.models.room import Room, RoomMember
+from app.models.user import User, UserSettings
 
 
 async def get_personal_stats(
     session: AsyncSession, user_id: UUID, start_date: date = None, end_date: date = None
 ) -> list[dict]:
-    # get all activities for user
-    activities_res = await session.execute(select(Activity).where(Activity.user_id == user_id))
-    activities = activities_res.scalars().all()
-
-    # get active activity if any
-    active_res = await session.execute(select(ActiveActivity).where(ActiveActivity.user_id == user_id))
-    active = active_res.scalar_one_or_none()
+    # one grouped row per activity over the daily rollup, with the date range applied in the join
+    # so that activities without logs in range still show up when live
+    log_join = [ActivityDailyTotal.activity_id == Activity.id]
+    if start_date:
+        log_join.append(ActivityDailyTotal.day >= start_date)
+    if end_date:
+        log_join.append(ActivityDailyTotal.day <= end_date)
+
+    query = (
+        select(
+            Activity.name,
+            Activity.color,
+            func.coalesce(func.sum(ActivityDailyTotal.minutes), 0),
+            ActiveActivity.start_time,
+        )
+        .outerjoin(ActivityDailyTotal, and_(*log_join))
+        .outerjoin(
+            ActiveActivity,
+            and_(ActiveActivity.user_id == Activity.user_id, ActiveActivity.activity_id == Activity.id),
+        )
+        .where(Activity.user_id == user_id)
+        .group_by(Activity.id, ActiveActivity.user_id)
+        .order_by(Activity.created_at)
+    )
+    result = await session.execute(query)
 
     stats = []
-    for activity in activities:
-        # get sum of logs
-        query = select(func.sum(ActivityLog.duration_minutes)).where(ActivityLog.activity_id == activity.id)
-        if start_date:
-            query = query.where(ActivityLog.timestamp >= start_date)
-        if end_date:
-            query = query.where(ActivityLog.timestamp <= end_date)
-
-        log_res = await session.execute(query)
-        total_minutes = log_res.scalar() or 0
-
-        is_live = active is not None and active.activity_id == activity.id
+    for name, color, total_minutes, live_start_time in result:
+        is_live = live_start_time is not None
 
         # only add to stats if there's logged time OR it's currently live
         if total_minutes > 0 or is_live:
-            stat = {"name": activity.name, "value": total_minutes, "color": activity.color, "is_live": is_live}
+            stat = {"name": name, "value": total_minutes, "color": color, "is_live": is_live}
             if is_live:
-                stat["start_time"] = active.start_time.isoformat()
+                stat["start_time"] = live_start_time.isoformat()
             stats.append(stat)
 
     return stats
@@ -49,93 +59,141 @@ async def get_personal_stats(
 async def get_participant_stats(
     session: AsyncSession, room_id: UUID, start_date: date = None, end_date: date = None
 ) -> list[dict]:
-    # get all members with their user info
-    members_res = await session.execute(
-        select(RoomMember).where(RoomMember.room_id == room_id).options(selectinload(RoomMember.user))
-    )
-    members = members_res.scalars().all()
-
-    stats = []
-    for member in members:
-        # get mappings for this user in this room
-        mappings_res = await session.execute(
-            select(ActivityObjectiveMapping).where(
-                ActivityObjectiveMapping.room_id == room_id, ActivityObjectiveMapping.user_id == member.user_id
-            )
+    # one row per (member, mapping) with the mapped time and live tracker joined in,
+    # so the query count does not depend on the room size
+    log_join = [ActivityDailyTotal.activity_id == ActivityObjectiveMapping.activity_id]
+    if start_date:
+        log_join.append(ActivityDailyTotal.day >= start_date)
+    if end_date:
+        log_join.append(ActivityDailyTotal.day <= end_date)
+
+    query = (
+        select(
+            RoomMember.user_id,
+            User.full_name,
+            ActivityObjectiveMapping.objective_id,
+            ActivityObjectiveMapping.weight,
+            func.coalesce(func.sum(ActivityDailyTotal.minutes), 0),
+            ActiveActivity.start_time,
         )
-        mappings = mappings_res.scalars().all()
-
-        # get active activity for this member
-        active_res = await session.execute(select(ActiveActivity).where(ActiveActivity.user_id == member.user_id))
-        active = active_res.scalar_one_or_none()
-
-        user_stats = {
-            "user_id": member.user_id,
-            "user_full_name": member.user.full_name,
-            "objectives": [],
-            "live_activities": [],
-        }
-
-        for mapping in mappings:
-            # get logs for mapped activity
-            query = select(func.sum(ActivityLog.duration_minutes)).where(ActivityLog.activity_id == mapping.activity_id)
-            if start_date:
-                query = query.where(ActivityLog.timestamp >= start_date)
-            if end_date:
-                query = query.where(ActivityLog.timestamp <= end_date)
-
-            log_res = await session.execute(query)
-            total_minutes = log_res.scalar() or 0
+        .join(User, User.id == RoomMember.user_id)
+        .outerjoin(
+            ActivityObjectiveMapping,
+            and_(
+                ActivityObjectiveMapping.room_id == RoomMember.room_id,
+                ActivityObjectiveMapping.user_id == RoomMember.user_id,
+            ),
+        )
+        .outerjoin(ActivityDailyTotal, and_(*log_join))
+        .outerjoin(
+            ActiveActivity,
+            and_(
+                ActiveActivity.user_id == ActivityObjectiveMapping.user_id,
+                ActiveActivity.activity_id == ActivityObjectiveMapping.activity_id,
+            ),
+        )
+        .where(RoomMember.room_id == room_id)
+        .group_by(
+            RoomMember.room_id,
+            RoomMember.user_id,
+            User.id,
+            ActivityObjectiveMapping.id,
+            ActiveActivity.user_id,
+        )
+        .order_by(RoomMember.joined_at, ActivityObjectiveMapping.created_at)
+    )
+    result = await session.execute(query)
 
-            obj_stat = {"objective_id": mapping.objective_id, "minutes": total_minutes * mapping.weight}
+    stats = {}
+    for user_id, full_name, objective_id, weight, total_minutes, live_start_time in result:
+        if user_id not in stats:
+            stats[user_id] = {
+                "user_id": user_id,
+                "user_full_name": full_name,
+                "objectives": [],
+                "live_activities": [],
+            }
+        user_stats = stats[user_id]
 
-            # check if this mapped activity is live
-            if active and active.activity_id == mapping.activity_id:
-                user_stats["live_activities"].append(
-                    {"objective_id": str(mapping.objective_id), "start_time": active.start_time.isoformat()}
-                )
-                obj_stat["is_live"] = True
+        # member without any mappings in this room
+        if objective_id is None:
+            continue
 
-            user_stats["objectives"].append(obj_stat)
+        obj_stat = {"objective_id": objective_id, "minutes": total_minutes * weight}
 
-        stats.append(user_stats)
+        # check if this mapped activity is live
+        if live_start_time is not None:
+            user_stats["live_activities"].append(
+                {"objective_id": str(objective_id), "start_time": live_start_time.isoformat()}
+            )
+            obj_stat["is_live"] = True
+
+        user_stats["objectives"].append(obj_stat)
+
+    return list(stats.values())
+
+
+async def get_personal_period_stats(
+    session: AsyncSession,
+    user_id: UUID,
+    resolution: ResolutionEnum = None,
+    start_date: date = None,
+    end_date: date = None,
+) -> dict:
+    if resolution is None:
+        result = await session.execute(select(UserSettings.resolution).where(UserSettings.user_id == user_id))
+        resolution = result.scalar_one_or_none() or ResolutionEnum.DAY
+
+    period = period_start(ActivityDailyTotal.day, resolution)
+    query = (
+        select(period, ActivityDailyTotal.activity_id, func.sum(ActivityDailyTotal.minutes))
+        .join(Activity, Activity.id == ActivityDailyTotal.activity_id)
+        .where(Activity.user_id == user_id)
+        .group_by(period, ActivityDailyTotal.activity_id)
+        .order_by(period)
+    )
+    if start_date:
+        query = query.where(ActivityDailyTotal.day >= start_date)
+    if end_date:
+        query = query.where(ActivityDailyTotal.day <= end_date)
 
-    return stats
+    result = await session.execute(query)
+    periods = [
+        {"period_start": bucket, "activity_id": activity_id, "minutes": minutes}
+        for bucket, activity_id, minutes in result
+    ]
+    return {"resolution": resolution, "periods": periods}
 
 
-async def get_leaderboard(
+async def get_room_period_stats(
     session: AsyncSession, room_id: UUID, start_date: date = None, end_date: date = None
-) -> list[dict]:
-    participant_stats = await get_participant_stats(session, room_id, start_date, end_date)
-
-    leaderboard = {}
-
-    for p_stat in participant_stats:
-        user_id = p_stat["user_id"]
-        user_full_name = p_stat["user_full_name"]
-        for obj_stat in p_stat["objectives"]:
-            obj_id = obj_stat["objective_id"]
-            if obj_id not in leaderboard:
-                leaderboard[obj_id] = []
-
-            rank_entry = {
-                "user_id": user_id,
-                "user_full_name": user_full_name,
-                "minutes": obj_stat["minutes"],
-                "is_live": obj_stat.get("is_live", False),
-            }
-
-            # find start_time if live
-            if rank_entry["is_live"] and p_stat.get("live_activities"):
-                live_act = next((la for la in p_stat["live_activities"] if la["objective_id"] == str(obj_id)), None)
-                if live_act:
-                    rank_entry["start_time"] = live_act["start_time"]
-
-            leaderboard[obj_id].append(rank_entry)
-
-    result = []
-    for obj_id, rankings in leaderboard.items():
-        rankings.sort(key=lambda x: x["minutes"], reverse=True)
-        result.append({"objective_id": obj_id, "rankings": rankings})
-
-    return result
+) -> dict:
+    result = await session.execute(select(Room.resolution).where(Room.id == room_id))
+    resolution = result.scalar_one_or_none()
+    if resolution is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found")
+
+    period = period_start(ActivityDailyTotal.day, resolution)
+    query = (
+        select(
+            period,
+            ActivityObjectiveMapping.user_id,
+            ActivityObjectiveMapping.objective_id,
+            func.sum(ActivityDailyTotal.minutes * ActivityObjectiveMapping.weight),
+        )
+        .join(ActivityDailyTotal, ActivityDailyTotal.activity_id == ActivityObjectiveMapping.activity_id)
+        .where(ActivityObjectiveMapping.room_id == room_id)
+        .group_by(period, ActivityObjectiveMapping.user_id, ActivityObjectiveMapping.objective_id)
+        .order_by(period)
+    )
+    if start_date:
+        query = query.where(ActivityDailyTotal.day >= start_date)
+    if end_date:
+        query = query.where(ActivityDailyTotal.day <= end_date)
+
+    result = await session.execute(query)
+    periods = [
+        {"period_start": bucket, "user_id": user_id, "objective_id": objective_id, "minutes": minutes}
+        for bucket, user_id, objective_id, minutes in result
+    ]
+    return {"resolution": resolution, "periods": periods}
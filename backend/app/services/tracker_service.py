@@ -2,12 +2,15 @@ from datetime import UTC, datetime
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Insert, delete, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database.upsert import dialect_insert
 from app.models.active_activity import ActiveActivity
 from app.models.activity import Activity, ActivityLog
-from app.services.notification_service import notify_live_status
+from app.services.live_status_dispatcher import add_live_status_event, wake_live_status_relay
+from app.services.live_status_service import bump_live_version, mapped_rooms
+from app.services.rollup_service import add_logged_minutes, lock_logged_activities
 
 
 async def get_active_activity(session: AsyncSession, user_id: UUID) -> ActiveActivity | None:
@@ -15,43 +18,67 @@ async def get_active_activity(session: AsyncSession, user_id: UUID) -> ActiveAct
     return result.scalar_one_or_none()
 
 
-async def start_activity(session: AsyncSession, user_id: UUID, activity_id: UUID) -> ActiveActivity:
-    # check if activity exists and belongs to user
-    activity_result = await session.execute(
-        select(Activity).where(Activity.id == activity_id, Activity.user_id == user_id)
+def _insert_tracker(session: AsyncSession, user_id: UUID, activity_id: UUID, start_time: datetime) -> Insert:
+    # inserts nothing unless the activity exists and belongs to the user
+    return dialect_insert(session, ActiveActivity).from_select(
+        ["user_id", "activity_id", "start_time"],
+        select(
+            literal(user_id, ActiveActivity.user_id.type),
+            Activity.id,
+            literal(start_time, ActiveActivity.start_time.type),
+        ).where(Activity.id == activity_id, Activity.user_id == user_id),
     )
-    activity = activity_result.scalar_one_or_none()
-    if not activity:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
 
-    # check if user already has an active activity
-    existing_active = await get_active_activity(session, user_id)
-    if existing_active:
+
+async def _returned_tracker(session: AsyncSession, stmt: Insert) -> ActiveActivity | None:
+    # populate_existing replaces a stale row of the user in the identity map
+    return await session.scalar(stmt.returning(ActiveActivity), execution_options={"populate_existing": True})
+
+
+async def _activity_not_found(session: AsyncSession, user_id: UUID, activity_id: UUID) -> bool:
+    result = await session.execute(select(Activity.id).where(Activity.id == activity_id, Activity.user_id == user_id))
+    return result.scalar_one_or_none() is None
+
+
+async def start_activity(session: AsyncSession, user_id: UUID, activity_id: UUID) -> ActiveActivity:
+    # a single statement, so concurrent starts cannot both succeed
+    stmt = _insert_tracker(session, user_id, activity_id, datetime.now(UTC))
+    active_activity = await _returned_tracker(session, stmt.on_conflict_do_nothing(index_elements=["user_id"]))
+    if not active_activity:
+        if await _activity_not_found(session, user_id, activity_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User already has an active activity. Stop it first or use switch.",
         )
 
-    active_activity = ActiveActivity(user_id=user_id, activity_id=activity_id, start_time=datetime.now(UTC))
-    session.add(active_activity)
+    await bump_live_version(session, mapped_rooms(user_id, activity_id))
+    add_live_status_event(session, user_id, activity_id, True, active_activity.start_time)
     await session.commit()
-    await session.refresh(active_activity)
 
-    await notify_live_status(session, user_id, activity_id, True, active_activity.start_time)
+    wake_live_status_relay()
 
     return active_activity
 
 
-async def stop_activity(session: AsyncSession, user_id: UUID) -> ActivityLog | None:
-    active_activity = await get_active_activity(session, user_id)
-    if not active_activity:
-        return None
+async def _take_tracker(session: AsyncSession, user_id: UUID) -> tuple[UUID, datetime] | None:
+    """Delete the running tracker, returning its activity and start time; a concurrent stop gets nothing."""
+    result = await session.execute(
+        delete(ActiveActivity)
+        .where(ActiveActivity.user_id == user_id)
+        .returning(ActiveActivity.activity_id, ActiveActivity.start_time)
+    )
+    return result.one_or_none()
 
-    activity_id = active_activity.activity_id
+
+async def _log_tracked_time(
+    session: AsyncSession, user_id: UUID, activity_id: UUID, start_time: datetime, now: datetime
+) -> ActivityLog:
+    # the activity before the rooms, in the same order as mapping changes take them
+    await lock_logged_activities(session, [activity_id])
+    await bump_live_version(session, mapped_rooms(user_id, activity_id))
 
     # calculate duration
-    now = datetime.now(UTC)
-    start_time = active_activity.start_time
     if start_time.tzinfo is None:
         start_time = start_time.replace(tzinfo=UTC)
     duration_seconds = (now - start_time).total_seconds()
@@ -63,17 +90,50 @@ async def stop_activity(session: AsyncSession, user_id: UUID) -> ActivityLog | N
         duration_minutes=duration_minutes,
     )
     session.add(log)
+    await add_logged_minutes(session, [(activity_id, log.timestamp, log.duration_minutes)], lock=False)
+    return log
+
+
+async def stop_activity(session: AsyncSession, user_id: UUID) -> ActivityLog | None:
+    tracker = await _take_tracker(session, user_id)
+    if not tracker:
+        return None
 
-    await session.delete(active_activity)
+    activity_id, start_time = tracker
+    log = await _log_tracked_time(session, user_id, activity_id, start_time, datetime.now(UTC))
+    add_live_status_event(session, user_id, activity_id, False)
 
     await session.commit()
-    await session.refresh(log)
 
-    await notify_live_status(session, user_id, activity_id, False)
+    wake_live_status_relay()
 
     return log
 
 
 async def switch_activity(session: AsyncSession, user_id: UUID, new_activity_id: UUID) -> ActiveActivity:
-    await stop_activity(session, user_id)
-    return await start_activity(session, user_id, new_activity_id)
+    """Log the running tracker and start the new one in a single transaction, so the user is never without one."""
+    now = datetime.now(UTC)
+    stmt = _insert_tracker(session, user_id, new_activity_id, now).on_conflict_do_nothing(index_elements=["user_id"])
+    while True:
+        tracker = await _take_tracker(session, user_id)
+        active_activity = await _returned_tracker(session, stmt)
+        if active_activity:
+            break
+        if tracker or await _activity_not_found(session, user_id, new_activity_id):
+            # rolling back the session restores the running tracker
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
+        # a concurrent switch or start replaced the tracker after the delete looked for it,
+        # so take that one instead of overwriting it without logging its time
+
+    previous_activity_id = None
+    if tracker:
+        previous_activity_id, start_time = tracker
+        await _log_tracked_time(session, user_id, previous_activity_id, start_time, now)
+
+    await bump_live_version(session, mapped_rooms(user_id, new_activity_id))
+    add_live_status_event(session, user_id, new_activity_id, True, now, previous_activity_id)
+    await session.commit()
+
+    wake_live_status_relay()
+
+    return active_activity
@@ -1,3 +1,4 @@
+import json
 from datetime import date
 from uuid import UUID, uuid4
 
@@ -112,10 +113,113 @@ class TestActivitiesE2E:
         assert len(logs) == 1
         assert logs[0]["duration_minutes"] == 45
 
-    async def test_import_not_implemented(self, client: AsyncClient, token_headers: dict[str, str]):
-        """Test that the import endpoint returns 501 Not Implemented."""
-        response = await client.post("/api/v1/activities/import", headers=token_headers)
-        assert response.status_code == 501
+    async def test_logged_time_reaches_personal_stats(self, client: AsyncClient, token_headers: dict[str, str]):
+        """Test that manual logs are rolled up per day and show up in personal stats."""
+        activity_id = self.activity2.id
+        for log_date, minutes in [(date(2025, 1, 15), 45), (date(2025, 1, 15), 15), (date(2025, 2, 1), 30)]:
+            response = await client.post(
+                f"/api/v1/activities/{activity_id}/logs",
+                headers=token_headers,
+                json={"timestamp": log_date.isoformat(), "duration_minutes": minutes},
+            )
+            assert response.status_code == 200
+
+        response = await client.get("/api/v1/users/me/stats", headers=token_headers)
+        assert response.status_code == 200
+        assert response.json() == [
+            {"name": "Coding", "value": 90, "color": "#00FF00", "is_live": False, "start_time": None}
+        ]
+
+        response = await client.get(
+            "/api/v1/users/me/stats",
+            headers=token_headers,
+            params={"start_date": "2025-01-01", "end_date": "2025-01-31"},
+        )
+        assert response.status_code == 200
+        assert response.json()[0]["value"] == 60
+
+    async def test_batch_log_creation(self, client: AsyncClient, token_headers: dict[str, str]):
+        """Test creating logs for several activities in one request."""
+        logs = [
+            {"activity_id": str(self.activity1.id), "timestamp": "2024-05-01", "duration_minutes": 15},
+            {"activity_id": str(self.activity2.id), "timestamp": "2024-05-01", "duration_minutes": 25},
+            {"activity_id": str(self.activity1.id), "timestamp": "2024-05-02", "duration_minutes": 35},
+        ]
+
+        response = await client.post("/api/v1/activities/logs/batch", headers=token_headers, json={"logs": logs})
+        assert response.status_code == 200
+        created = response.json()
+        assert [log["duration_minutes"] for log in created] == [15, 25, 35]
+        assert len({log["id"] for log in created}) == 3
+
+        response = await client.get(f"/api/v1/activities/{self.activity1.id}/logs", headers=token_headers)
+        assert sorted(log["duration_minutes"] for log in response.json()) == [15, 35]
+
+        # 2. A single foreign activity rejects the whole batch
+        logs.append({"activity_id": str(uuid4()), "timestamp": "2024-05-03", "duration_minutes": 5})
+        response = await client.post("/api/v1/activities/logs/batch", headers=token_headers, json={"logs": logs})
+        assert response.status_code == 404
+        response = await client.get(f"/api/v1/activities/{self.activity2.id}/logs", headers=token_headers)
+        assert len(response.json()) == 1
+
+    async def test_import_csv_history(self, client: AsyncClient, token_headers: dict[str, str]):
+        """Test importing a CSV history into existing and new activities, and that re-importing it is a no-op."""
+        body = (
+            "activity,timestamp,duration_minutes,emoji\n"
+            "Reading,2024-03-01,30,\n"
+            "Running,2024-03-01,45,🏃\n"
+            "Running,2024-03-02,oops,\n"
+            "Running,2024-03-03,20,\n"
+        )
+        headers = {**token_headers, "Content-Type": "text/csv"}
+
+        response = await client.post("/api/v1/activities/import", headers=headers, content=body)
+        assert response.status_code == 200
+        summary = json.loads(response.text.splitlines()[-1])
+        assert summary["done"] is True
+        assert (summary["rows"], summary["imported"], summary["invalid"]) == (4, 3, 1)
+        assert summary["activities_created"] == 1
+        assert summary["errors"] == [
+            {
+                "line": 4,
+                "error": "duration_minutes: Input should be a valid integer, unable to parse string as an integer",
+            }
+        ]
+
+        response = await client.get(f"/api/v1/activities/{self.activity1.id}/logs", headers=token_headers)
+        assert [log["duration_minutes"] for log in response.json()] == [30]
+
+        response = await client.post("/api/v1/activities/import", headers=headers, content=body)
+        summary = json.loads(response.text.splitlines()[-1])
+        assert (summary["imported"], summary["duplicates"], summary["activities_created"]) == (0, 3, 0)
+
+    async def test_import_keeps_different_files_apart(self, client: AsyncClient, token_headers: dict[str, str]):
+        """Test that a second history is fully imported, even with the same lines or source ids as the first."""
+        headers = {**token_headers, "Content-Type": "text/csv"}
+        files = [
+            "activity,timestamp,duration_minutes\nRunning,2024-01-01,30\nRunning,2024-01-02,40\n",
+            "activity,timestamp,duration_minutes\nReading,2023-05-01,60\nReading,2023-05-02,70\n",
+            "id,activity,timestamp,duration_minutes\n1,Chess,2023-05-01,15\n2,Chess,2023-05-01,15\n",
+            "id,activity,timestamp,duration_minutes\n1,Yoga,2023-06-01,25\n2,Yoga,2023-06-01,25\n",
+            # repeated rows without an id are separate sessions
+            "activity,timestamp,duration_minutes\nRunning,2024-01-01,30\nRunning,2024-01-01,30\n",
+        ]
+
+        imported = []
+        for body in files:
+            response = await client.post("/api/v1/activities/import", headers=headers, content=body)
+            summary = json.loads(response.text.splitlines()[-1])
+            imported.append((summary["imported"], summary["duplicates"]))
+        assert imported == [(2, 0), (2, 0), (2, 0), (2, 0), (1, 1)]
+
+        response = await client.post("/api/v1/activities/import", headers=headers, content=files[-1])
+        summary = json.loads(response.text.splitlines()[-1])
+        assert (summary["imported"], summary["duplicates"]) == (0, 2)
+
+    async def test_import_rejects_unknown_formats(self, client: AsyncClient, token_headers: dict[str, str]):
+        """Test that the import endpoint only accepts CSV and NDJSON uploads."""
+        response = await client.post("/api/v1/activities/import", headers=token_headers, content=b"<xml/>")
+        assert response.status_code == 415
 
     async def test_start_stop_get_active_activity(self, client: AsyncClient, token_headers: dict[str, str]):
         """Test the full lifecycle: start, get, and stop an activity."""
@@ -171,3 +171,165 @@ class TestRoomsE2E:
             json={"name": "Should Fail", "emoji": "❌", "color": "#FF0000", "target_minutes": 60, "metric": "minutes"},
         )
         assert response.status_code == 403  # Forbidden
+
+    async def test_admin_can_remove_member(
+        self,
+        client: AsyncClient,
+        token_headers: dict[str, str],
+        another_user: User,
+        another_user_headers: dict[str, str],
+    ):
+        """Test that a removed member loses access to the room right away."""
+        response = await client.post(
+            "/api/v1/rooms", headers=token_headers, json={"name": "Removal Room", "resolution": "day"}
+        )
+        room_id = response.json()["id"]
+        response = await client.post(f"/api/v1/rooms/{room_id}/join", headers=another_user_headers)
+        assert response.status_code == 200
+
+        # 1. The member cannot remove anyone, the admin cannot remove themselves
+        response = await client.delete(
+            f"/api/v1/rooms/{room_id}/members/{another_user.id}", headers=another_user_headers
+        )
+        assert response.status_code == 403
+        admin_id = (await client.get("/api/v1/users/me", headers=token_headers)).json()["id"]
+        response = await client.delete(f"/api/v1/rooms/{room_id}/members/{admin_id}", headers=token_headers)
+        assert response.status_code == 400
+
+        # 2. The admin removes the member
+        response = await client.delete(f"/api/v1/rooms/{room_id}/members/{another_user.id}", headers=token_headers)
+        assert response.status_code == 200
+        assert response.json() == {"status": "removed"}
+
+        # 3. The removed member can no longer map activities in the room
+        response = await client.get("/api/v1/rooms", headers=another_user_headers)
+        assert not any(room["id"] == room_id for room in response.json())
+        response = await client.put(
+            f"/api/v1/rooms/{room_id}/mapping",
+            headers=another_user_headers,
+            json={"activity_id": str(uuid4()), "objective_id": str(uuid4()), "weight": 1.0},
+        )
+        assert response.status_code == 403
+
+        # 4. Removing them again fails
+        response = await client.delete(f"/api/v1/rooms/{room_id}/members/{another_user.id}", headers=token_headers)
+        assert response.status_code == 404
+
+    async def test_live_status_polls_are_versioned(self, client: AsyncClient, token_headers: dict[str, str]):
+        """Test that live-status polls answer 304 until a tracker or mapping change bumps the version."""
+        response = await client.post(
+            "/api/v1/rooms", headers=token_headers, json={"name": "Live Room", "resolution": "day"}
+        )
+        room_id = response.json()["id"]
+        response = await client.post(
+            f"/api/v1/rooms/{room_id}/objectives",
+            headers=token_headers,
+            json={"name": "Focus", "target_minutes": 60, "metric": "minutes", "emoji": "🎯", "color": "#000000"},
+        )
+        objective_id = response.json()["id"]
+        response = await client.post(
+            "/api/v1/activities",
+            headers=token_headers,
+            json={"name": "Work", "emoji": "💼", "color": "#111111", "resolution": "day"},
+        )
+        activity_id = response.json()["id"]
+
+        # 1. Nothing is live yet
+        response = await client.get(f"/api/v1/rooms/{room_id}/live-status", headers=token_headers)
+        assert response.status_code == 200
+        version = response.json()["version"]
+        assert response.json()["users"] == {}
+        room_etag = response.headers["ETag"]
+        response = await client.get(
+            f"/api/v1/rooms/{room_id}/live-status", headers={**token_headers, "If-None-Match": room_etag}
+        )
+        assert response.status_code == 304
+
+        response = await client.get("/api/v1/live-status", headers=token_headers)
+        etag = response.headers["ETag"]
+        response = await client.get("/api/v1/live-status", headers={**token_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+        # 2. Mapping the activity and starting it bump the version
+        await client.put(
+            f"/api/v1/rooms/{room_id}/mapping",
+            headers=token_headers,
+            json={"activity_id": activity_id, "objective_id": objective_id},
+        )
+        await client.post("/api/v1/activities/active", headers=token_headers, json={"activity_id": activity_id})
+
+        response = await client.get(
+            f"/api/v1/rooms/{room_id}/live-status", headers={**token_headers, "If-None-Match": room_etag}
+        )
+        assert response.status_code == 200
+        assert response.json()["version"] > version
+        [(_, entries)] = response.json()["users"].items()
+        assert entries[0]["objectiveId"] == objective_id
+
+        response = await client.get("/api/v1/live-status", headers={**token_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert room_id in response.json()
+
+        # 3. With a cursor only the rooms whose version moved are returned
+        response = await client.post(
+            "/api/v1/rooms", headers=token_headers, json={"name": "Quiet Room", "resolution": "day"}
+        )
+        quiet_room_id = response.json()["id"]
+        response = await client.get("/api/v1/live-status", headers=token_headers, params={"since": ""})
+        assert response.json()["rooms"].keys() >= {room_id, quiet_room_id}
+        cursor = response.json()["since"]
+        response = await client.get("/api/v1/live-status", headers=token_headers, params={"since": cursor})
+        assert response.status_code == 304
+
+        await client.delete("/api/v1/activities/active", headers=token_headers)
+        response = await client.get("/api/v1/live-status", headers=token_headers, params={"since": cursor})
+        assert response.status_code == 200
+        assert response.json()["rooms"] == {room_id: {}}
+        assert response.json()["removed"] == []
+        assert response.json()["since"] != cursor
+
+        response = await client.get("/api/v1/live-status", headers=token_headers, params={"since": "nope"})
+        assert response.status_code == 400
+
+    async def test_bulk_mapping_edit(self, client: AsyncClient, token_headers: dict[str, str]):
+        """Test mapping several activities in one request and replacing the set afterwards."""
+        response = await client.post(
+            "/api/v1/rooms", headers=token_headers, json={"name": "Bulk Room", "resolution": "day"}
+        )
+        room_id = response.json()["id"]
+        objective_ids = []
+        for name in ("Focus", "Reading"):
+            response = await client.post(
+                f"/api/v1/rooms/{room_id}/objectives",
+                headers=token_headers,
+                json={"name": name, "target_minutes": 60, "metric": "minutes", "emoji": "🎯", "color": "#000000"},
+            )
+            objective_ids.append(response.json()["id"])
+        response = await client.post(
+            "/api/v1/activities",
+            headers=token_headers,
+            json={"name": "Work", "emoji": "💼", "color": "#111111", "resolution": "day"},
+        )
+        activity_id = response.json()["id"]
+
+        response = await client.post(
+            f"/api/v1/rooms/{room_id}/mapping/bulk",
+            headers=token_headers,
+            json={"upsert": [{"activity_id": activity_id, "objective_id": o} for o in objective_ids]},
+        )
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+
+        response = await client.post(
+            f"/api/v1/rooms/{room_id}/mapping/bulk",
+            headers=token_headers,
+            json={
+                "upsert": [{"activity_id": activity_id, "objective_id": objective_ids[0], "weight": 2}],
+                "replace": True,
+            },
+        )
+        assert [(m["objective_id"], m["weight"]) for m in response.json()] == [(objective_ids[0], 2.0)]
+
+        response = await client.get(f"/api/v1/rooms/{room_id}/mapping", headers=token_headers)
+        assert len(response.json()) == 1
@@ -0,0 +1,27 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schema.activity import ActivityLogBatchItem
+from app.services.activity_log_service import log_activities
+from tests.unit.test_stats_service import QueryCounter, create_room_with_members
+
+
+@pytest.mark.asyncio
+async def test_batch_logging_takes_constant_statements(session: AsyncSession):
+    _, _, users, activities = await create_room_with_members(session, 1)
+
+    def batch(size: int) -> list[ActivityLogBatchItem]:
+        return [
+            ActivityLogBatchItem(activity_id=activities[0].id, timestamp=date(2025, 3, 1 + i % 28), duration_minutes=5)
+            for i in range(size)
+        ]
+
+    async with QueryCounter(session) as small_counter:
+        await log_activities(session, batch(2), users[0].id)
+    async with QueryCounter(session) as big_counter:
+        rows = await log_activities(session, batch(50), users[0].id)
+
+    assert small_counter.count == big_counter.count
+    assert len(rows) == 50
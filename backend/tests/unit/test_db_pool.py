@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.database.pool import InstrumentedPool
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_track_checkouts_and_timeouts():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=InstrumentedPool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            assert engine.pool.stats()["checked_out"] == 1
+
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+
+        stats = engine.pool.stats()
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 2
+        assert stats["timeouts"] == 1
+        assert stats["wait_seconds_max"] >= 0.05
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exports_pool_stats(client, monkeypatch: pytest.MonkeyPatch):
+    response = await client.get("/metrics")
+    assert response.status_code == 404  # disabled by default
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-me")
+    response = await client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+
+    assert response.status_code == 200
+    assert {"size", "checked_out", "overflow", "wait_seconds_total"} <= response.json()["db_pool"].keys()
@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schema.activity import ActivityCreate, ActivityUpdate
+from app.models.user import ResolutionEnum, User
+from app.services.activity_service import create_activity, update_activity
+from tests.unit.test_stats_service import QueryCounter
+
+
+@pytest.mark.asyncio
+async def test_writes_return_server_defaults_without_a_refresh(session: AsyncSession):
+    user = User(email="writer@example.com", password_hash="x", full_name="Writer")
+    session.add(user)
+    await session.commit()
+
+    async with QueryCounter(session) as counter:
+        activity = await create_activity(
+            session, ActivityCreate(name="Work", emoji="💼", color="#111", resolution=ResolutionEnum.DAY), user.id
+        )
+    assert counter.count == 1  # INSERT .. RETURNING created_at
+    assert activity.created_at is not None
+
+    async with QueryCounter(session) as counter:
+        activity = await update_activity(session, activity, ActivityUpdate(name="Deep work"))
+    assert counter.count == 1
+    assert activity.name == "Deep work"
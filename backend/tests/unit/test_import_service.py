@@ -0,0 +1,72 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.activity import Activity, ActivityDailyTotal, ActivityLog
+from app.services.import_service import ImportFormat, import_activity_logs, iter_lines
+from tests.unit.test_stats_service import create_room_with_members
+
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+async def collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+@pytest.mark.asyncio
+async def test_lines_survive_chunk_boundaries():
+    data = "a,b\r\nnaïve,1\nlast".encode()
+
+    assert await collect(iter_lines(chunked(data, 3))) == ["a,b", "naïve,1", "last"]
+
+
+@pytest.mark.asyncio
+async def test_overlong_lines_are_dropped():
+    data = b"ok\n" + b"x" * 50 + b"\nok again\n"
+
+    assert await collect(iter_lines(chunked(data, 8), max_length=10)) == ["ok", None, "ok again"]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_import_commits_in_batches_and_is_idempotent(session: AsyncSession):
+    room, _, users, activities = await create_room_with_members(session, 1)
+    lines = [
+        '{"id": "a1", "activity": "Work", "timestamp": "2025-01-10", "duration_minutes": 10}',
+        '{"id": "a2", "activity": "Chess", "timestamp": "2025-01-10", "duration_minutes": 20}',
+        "[1, 2]",
+        '{"id": "a3", "activity": "Chess", "timestamp": "2025-01-11", "duration_minutes": 30}',
+    ]
+    data = "\n".join(lines).encode()
+
+    progress = await collect(
+        import_activity_logs(session, users[0].id, iter_lines(chunked(data, 16)), ImportFormat.NDJSON, batch_size=2)
+    )
+
+    assert [update["imported"] for update in progress] == [2, 3]
+    assert progress[-1]["invalid"] == 1
+    assert progress[-1]["activities_created"] == 1
+
+    result = await session.execute(
+        select(ActivityDailyTotal.minutes).where(
+            ActivityDailyTotal.activity_id == activities[0].id, ActivityDailyTotal.day == date(2025, 1, 10)
+        )
+    )
+    assert result.scalar_one() == 50  # 40 from the fixture, 10 imported
+
+    progress = await collect(
+        import_activity_logs(session, users[0].id, iter_lines(chunked(data, 16)), ImportFormat.NDJSON)
+    )
+    assert (progress[-1]["imported"], progress[-1]["duplicates"]) == (0, 3)
+
+    result = await session.execute(
+        select(func.count())
+        .select_from(ActivityLog)
+        .join(Activity)
+        .where(Activity.user_id == users[0].id, Activity.name == "Chess")
+    )
+    assert result.scalar_one() == 2
@@ -0,0 +1,166 @@
+from datetime import UTC, date, datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schema.activity import ActivityLogCreate
+from app.models.active_activity import ActiveActivity
+from app.models.leaderboard import LeaderboardEntry
+from app.models.mapping import ActivityObjectiveMapping
+from app.models.room import Objective
+from app.models.user import ResolutionEnum
+from app.services.activity_log_service import log_activity
+from app.services.leaderboard_service import get_leaderboard
+from app.services.mapping_service import delete_mapping, update_mapping
+from tests.unit.test_stats_service import QueryCounter, create_room_with_members
+
+
+async def get_rankings(session: AsyncSession, room_id, period: date = None) -> dict:
+    leaderboard = await get_leaderboard(session, room_id, period)
+    assert len(leaderboard) == 1
+    return {entry["user_id"]: entry for entry in leaderboard[0]["rankings"]}
+
+
+@pytest.mark.asyncio
+class TestLeaderboardService:
+    async def test_leaderboard_is_sorted_and_weighted(self, session: AsyncSession):
+        """Test that rankings apply mapping weights and are sorted by minutes."""
+        room, objective, users, activities = await create_room_with_members(session, 3)
+        await log_activity(
+            session, activities[2].id, ActivityLogCreate(timestamp=date(2025, 1, 12), duration_minutes=100), users[2].id
+        )
+
+        leaderboard = await get_leaderboard(session, room.id)
+
+        assert leaderboard[0]["objective_id"] == objective.id
+        rankings = leaderboard[0]["rankings"]
+        assert [r["user_id"] for r in rankings][0] == users[2].id
+        assert [r["minutes"] for r in rankings] == [80, 30, 30]
+
+    async def test_log_write_updates_cached_entries(self, session: AsyncSession):
+        """Test that a new log is added to the cached entries of its period."""
+        room, _, users, activities = await create_room_with_members(session, 1)
+
+        await log_activity(
+            session, activities[0].id, ActivityLogCreate(timestamp=date(2025, 1, 10), duration_minutes=10), users[0].id
+        )
+
+        result = await session.execute(
+            select(LeaderboardEntry.period_start, LeaderboardEntry.minutes).where(LeaderboardEntry.room_id == room.id)
+        )
+        assert sorted(result.all()) == [(date(2025, 1, 10), 25), (date(2025, 2, 10), 10)]
+
+    async def test_period_lookup_uses_room_resolution(self, session: AsyncSession):
+        """Test that a period query returns the bucket of the room's resolution containing the date."""
+        room, _, users, _ = await create_room_with_members(session, 1)
+        room.resolution = ResolutionEnum.MONTH
+        room.leaderboard_ready = False
+        await session.commit()
+
+        rankings = await get_rankings(session, room.id, period=date(2025, 1, 31))
+        assert rankings[users[0].id]["minutes"] == 20
+
+        rankings = await get_rankings(session, room.id, period=date(2025, 3, 1))
+        assert rankings[users[0].id]["minutes"] == 0
+
+    async def test_mapping_weight_change_rebuilds_member(self, session: AsyncSession):
+        """Test that changing or deleting a mapping updates the member's cached minutes."""
+        room, objective, users, activities = await create_room_with_members(session, 2)
+
+        await update_mapping(session, room.id, users[0].id, activities[0].id, objective.id, weight=2.0)
+
+        rankings = await get_rankings(session, room.id)
+        assert rankings[users[0].id]["minutes"] == 120
+        assert rankings[users[1].id]["minutes"] == 30
+
+        await delete_mapping(session, room.id, users[0].id, activities[0].id, objective.id)
+
+        rankings = await get_rankings(session, room.id)
+        assert users[0].id not in rankings
+
+    async def test_cold_cache_is_rebuilt(self, session: AsyncSession):
+        """Test that a room marked cold gets its entries rebuilt from the daily rollup."""
+        room, _, users, _ = await create_room_with_members(session, 2)
+        result = await session.execute(select(LeaderboardEntry).where(LeaderboardEntry.room_id == room.id))
+        for entry in result.scalars():
+            entry.minutes = 999
+        room.leaderboard_ready = False
+        await session.commit()
+
+        rankings = await get_rankings(session, room.id)
+
+        assert {r["minutes"] for r in rankings.values()} == {30}
+        assert room.leaderboard_ready is True
+
+    async def test_live_members_are_flagged(self, session: AsyncSession):
+        """Test that members tracking a mapped activity are marked live."""
+        room, _, users, activities = await create_room_with_members(session, 2)
+        session.add(ActiveActivity(user_id=users[0].id, activity_id=activities[0].id, start_time=datetime.now(UTC)))
+        await session.commit()
+
+        rankings = await get_rankings(session, room.id)
+
+        assert rankings[users[0].id]["is_live"] is True
+        assert "start_time" in rankings[users[0].id]
+        assert rankings[users[1].id]["is_live"] is False
+
+    async def test_warm_read_query_count_does_not_depend_on_room_size(self, session: AsyncSession):
+        """Test that reading a warm leaderboard costs the same for small and big rooms."""
+        small_room, _, _, _ = await create_room_with_members(session, 2)
+        big_room, _, _, _ = await create_room_with_members(session, 10)
+
+        async with QueryCounter(session) as small_counter:
+            await get_leaderboard(session, small_room.id)
+        async with QueryCounter(session) as big_counter:
+            big_leaderboard = await get_leaderboard(session, big_room.id)
+
+        assert small_counter.count == big_counter.count
+        assert len(big_leaderboard[0]["rankings"]) == 10
+
+    async def test_paginated_leaderboard_reports_my_rank(self, session: AsyncSession):
+        """Test that a page holds only the requested rankings while my_rank is always reported."""
+        room, objective, users, activities = await create_room_with_members(session, 5)
+        for extra, (user, activity) in enumerate(zip(users, activities, strict=True)):
+            await log_activity(
+                session,
+                activity.id,
+                ActivityLogCreate(timestamp=date(2025, 3, 1), duration_minutes=extra * 20),
+                user.id,
+            )
+
+        leaderboard = await get_leaderboard(session, room.id, limit=2, offset=1, user_id=users[0].id)
+
+        assert len(leaderboard) == 1
+        assert leaderboard[0]["objective_id"] == objective.id
+        assert [r["user_id"] for r in leaderboard[0]["rankings"]] == [users[3].id, users[2].id]
+        assert [r["rank"] for r in leaderboard[0]["rankings"]] == [2, 3]
+        assert leaderboard[0]["my_rank"] == {"rank": 5, "minutes": 30}
+
+    async def test_tied_members_share_a_rank(self, session: AsyncSession):
+        """Test that members with equal minutes get the same rank."""
+        room, _, users, _ = await create_room_with_members(session, 3)
+
+        leaderboard = await get_leaderboard(session, room.id, limit=1, user_id=users[2].id)
+
+        assert len(leaderboard[0]["rankings"]) == 1
+        assert leaderboard[0]["rankings"][0]["rank"] == 1
+        assert leaderboard[0]["my_rank"]["rank"] == 1
+
+    async def test_objective_filter(self, session: AsyncSession):
+        """Test that only the requested objective is returned."""
+        room, objective, users, activities = await create_room_with_members(session, 2)
+        other = Objective(room_id=room.id, name="Other", emoji="🧩", color="#222")
+        session.add(other)
+        await session.flush()
+        session.add(
+            ActivityObjectiveMapping(
+                room_id=room.id, user_id=users[0].id, activity_id=activities[0].id, objective_id=other.id, weight=1.0
+            )
+        )
+        await session.commit()
+
+        assert len(await get_leaderboard(session, room.id)) == 2
+        leaderboard = await get_leaderboard(session, room.id, objective_id=objective.id)
+        assert [o["objective_id"] for o in leaderboard] == [objective.id]
+        assert "my_rank" not in leaderboard[0]
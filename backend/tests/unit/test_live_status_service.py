@@ -0,0 +1,54 @@
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.active_activity import ActiveActivity
+from app.models.mapping import ActivityObjectiveMapping
+from app.models.room import Objective
+from app.services.live_status_service import get_live_status_for_user_rooms
+from tests.unit.test_stats_service import QueryCounter, create_room_with_members
+
+
+@pytest.mark.asyncio
+class TestLiveStatusService:
+    async def test_live_status_lists_mapped_objectives_of_live_members(self, session: AsyncSession):
+        """Test that every objective a live tracker is mapped to shows up, and only in the viewer's rooms."""
+        room, objective, users, activities = await create_room_with_members(session, 3)
+        other_room, _, _, _ = await create_room_with_members(session, 1)
+        second_objective = Objective(room_id=room.id, name="Reading", emoji="📚", color="#222")
+        session.add(second_objective)
+        await session.flush()
+        session.add(
+            ActivityObjectiveMapping(
+                room_id=room.id, user_id=users[1].id, activity_id=activities[1].id, objective_id=second_objective.id
+            )
+        )
+        tracker = ActiveActivity(
+            user_id=users[1].id, activity_id=activities[1].id, start_time=datetime(2025, 1, 10, tzinfo=UTC)
+        )
+        session.add(tracker)
+        await session.commit()
+        await session.refresh(tracker)
+
+        live_status = await get_live_status_for_user_rooms(session, users[0].id)
+
+        assert list(live_status) == [str(room.id)]
+        assert list(live_status[str(room.id)]) == [str(users[1].id)]
+        assert sorted(entry["objectiveId"] for entry in live_status[str(room.id)][str(users[1].id)]) == sorted(
+            [str(objective.id), str(second_objective.id)]
+        )
+        assert live_status[str(room.id)][str(users[1].id)][0]["startTime"] == tracker.start_time.isoformat()
+        assert str(other_room.id) not in live_status
+
+    async def test_live_status_is_a_single_query(self, session: AsyncSession):
+        """Test that the live status takes one query, however many rooms and mappings there are."""
+        _, _, users, activities = await create_room_with_members(session, 5)
+        session.add(ActiveActivity(user_id=users[2].id, activity_id=activities[2].id))
+        await session.commit()
+
+        async with QueryCounter(session) as counter:
+            live_status = await get_live_status_for_user_rooms(session, users[0].id)
+
+        assert counter.count == 1
+        assert len(live_status) == 1
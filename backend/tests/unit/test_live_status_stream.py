@@ -0,0 +1,106 @@
+import json
+from datetime import UTC, datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.database.pubsub import RESET, change_listener
+from app.models.active_activity import ActiveActivity
+from app.services.live_status_stream import RESYNC, LiveStatusHub, live_status_hub, stream_live_status
+from tests.unit.test_stats_service import create_room_with_members
+
+
+def parse_event(message: str) -> tuple[str, dict]:
+    event, data = message.strip().split("\n")
+    return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def tracker_change(op: str, user_id, activity_id, start_time: str | None = None) -> dict:
+    return {
+        "table": "active_activities",
+        "op": op,
+        "user_id": str(user_id),
+        "activity_id": str(activity_id),
+        "start_time": start_time,
+    }
+
+
+@pytest.mark.asyncio
+class TestLiveStatusStream:
+    async def test_snapshot_then_deltas(self, session: AsyncSession):
+        """Test that a stream starts with the room snapshot and follows it with per-objective deltas."""
+        room, objective, users, activities = await create_room_with_members(session, 2)
+        tracker = ActiveActivity(
+            user_id=users[1].id, activity_id=activities[1].id, start_time=datetime(2025, 1, 10, 12, tzinfo=UTC)
+        )
+        session.add(tracker)
+        await session.commit()
+        await session.refresh(tracker)
+
+        events = await stream_live_status(session, users[0].id)
+        try:
+            event, snapshot = parse_event(await anext(events))
+            assert event == "snapshot"
+            assert snapshot == {
+                str(room.id): {
+                    str(users[1].id): [{"objectiveId": str(objective.id), "startTime": tracker.start_time.isoformat()}]
+                }
+            }
+
+            change_listener.dispatch(tracker_change("INSERT", users[0].id, activities[0].id, "2025-01-10T13:00:00"))
+            change_listener.dispatch(tracker_change("DELETE", users[1].id, activities[1].id))
+
+            event, delta = parse_event(await anext(events))
+            assert event == "delta"
+            assert delta == {
+                "userId": str(users[0].id),
+                "roomId": str(room.id),
+                "objectiveId": str(objective.id),
+                "live": True,
+                "startTime": "2025-01-10T13:00:00",
+            }
+            _, delta = parse_event(await anext(events))
+            assert (delta["userId"], delta["live"]) == (str(users[1].id), False)
+        finally:
+            await events.aclose()
+
+        assert live_status_hub.stats()["streams"] == 0
+
+    async def test_stream_ignores_users_outside_its_rooms(self, session: AsyncSession):
+        """Test that changes of users sharing no room with the subscriber are not sent."""
+        _, _, users, activities = await create_room_with_members(session, 1)
+        _, _, others, other_activities = await create_room_with_members(session, 1)
+
+        events = await stream_live_status(session, users[0].id)
+        try:
+            await anext(events)
+            change_listener.dispatch(tracker_change("INSERT", others[0].id, other_activities[0].id, "2025-01-10"))
+            change_listener.dispatch(RESET)
+
+            event, _ = parse_event(await anext(events))
+            assert event == "resync"
+        finally:
+            await events.aclose()
+
+
+def test_slow_stream_is_told_to_resync():
+    hub = LiveStatusHub(queue_size=2)
+    queue = hub.subscribe()
+
+    for _ in range(3):
+        hub.publish({"table": "active_activities", "op": "INSERT"})
+
+    assert queue.qsize() == 1
+    assert queue.get_nowait() is RESYNC
+    assert hub.stats() == {"streams": 1, "resyncs": 1}
+
+
+@pytest.mark.asyncio
+async def test_stream_requires_token(client: AsyncClient):
+    response = await client.get(f"{settings.API_V1_STR}/live-status/stream")
+    assert response.status_code == 401
+
+    response = await client.get(f"{settings.API_V1_STR}/live-status/stream", params={"token": "invalid"})
+    assert response.status_code == 401
@@ -0,0 +1,91 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.mapping import ActivityObjectiveMapping
+from app.models.room import Objective
+from app.services.leaderboard_service import get_leaderboard
+from app.services.live_status_service import get_room_live_version
+from app.services.mapping_service import update_mapping, update_mappings
+from tests.unit.test_stats_service import create_room_with_members
+
+
+async def mapping_count(session: AsyncSession, room_id) -> int:
+    result = await session.execute(
+        select(func.count()).select_from(ActivityObjectiveMapping).where(ActivityObjectiveMapping.room_id == room_id)
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+class TestMappingService:
+    async def test_update_mapping_upserts_in_place(self, session: AsyncSession):
+        """Test that re-mapping an activity updates the weight of the existing row."""
+        room, objective, users, activities = await create_room_with_members(session, 1)
+
+        first = await update_mapping(session, room.id, users[0].id, activities[0].id, objective.id, weight=2.0)
+        second = await update_mapping(session, room.id, users[0].id, activities[0].id, objective.id, weight=3.0)
+
+        assert second.id == first.id
+        assert second.weight == 3.0
+        assert second.created_at is not None
+        assert await mapping_count(session, room.id) == 1
+
+    async def test_update_mapping_checks_membership_and_ownership(self, session: AsyncSession):
+        """Test that only members can map, and only their own activities."""
+        room, objective, users, _ = await create_room_with_members(session, 1)
+        _, _, others, other_activities = await create_room_with_members(session, 1)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await update_mapping(session, room.id, others[0].id, other_activities[0].id, objective.id)
+        assert exc_info.value.status_code == 403
+
+        with pytest.raises(HTTPException) as exc_info:
+            await update_mapping(session, room.id, users[0].id, uuid4(), objective.id)
+        assert exc_info.value.status_code == 404
+        assert await mapping_count(session, room.id) == 1
+
+    async def test_bulk_update_applies_upserts_and_deletes(self, session: AsyncSession):
+        """Test that a partial bulk edit adds, reweights and deletes mappings, rebuilding the member's entries."""
+        room, objective, users, activities = await create_room_with_members(session, 1)
+        second = Objective(room_id=room.id, name="Reading", emoji="📚", color="#222")
+        session.add(second)
+        await session.commit()
+        version = room.live_version
+
+        mappings = await update_mappings(
+            session,
+            room.id,
+            users[0].id,
+            {(activities[0].id, second.id): 2.0},
+            deletes=[(activities[0].id, objective.id)],
+        )
+
+        assert [(m.objective_id, m.weight) for m in mappings] == [(second.id, 2.0)]
+        leaderboard = {entry["objective_id"]: entry["rankings"] for entry in await get_leaderboard(session, room.id)}
+        assert leaderboard[second.id][0]["minutes"] == 120
+        assert all(entry["minutes"] == 0 for entry in leaderboard.get(objective.id, []))
+        assert await get_room_live_version(session, room.id) == version + 1
+
+    async def test_bulk_update_can_replace_the_mapping_set(self, session: AsyncSession):
+        """Test that a replacing bulk edit deletes every mapping it does not list."""
+        room, objective, users, activities = await create_room_with_members(session, 1)
+        second = Objective(room_id=room.id, name="Reading", emoji="📚", color="#222")
+        session.add(second)
+        await session.commit()
+        await update_mappings(session, room.id, users[0].id, {(activities[0].id, second.id): 1.0})
+
+        mappings = await update_mappings(
+            session, room.id, users[0].id, {(activities[0].id, objective.id): 3.0}, replace=True
+        )
+
+        assert [(m.objective_id, m.weight) for m in mappings] == [(objective.id, 3.0)]
+        assert await mapping_count(session, room.id) == 1
+
+        with pytest.raises(HTTPException) as exc_info:
+            await update_mappings(session, room.id, users[0].id, {(uuid4(), objective.id): 1.0}, replace=True)
+        assert exc_info.value.status_code == 404
+        assert await mapping_count(session, room.id) == 1
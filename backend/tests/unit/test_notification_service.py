@@ -0,0 +1,186 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import app
+from app.models.outbox import OutboxEvent
+from app.services.live_status_dispatcher import LiveStatusDispatcher, add_live_status_event, live_status_dispatcher
+from app.services.notification_service import close_ws_client, get_ws_client
+from tests.unit.test_stats_service import create_room_with_members
+
+
+@pytest.mark.asyncio
+async def test_ws_client_lives_with_the_app(monkeypatch: pytest.MonkeyPatch):
+    # events left over by other tests would be relayed right away
+    monkeypatch.setattr(live_status_dispatcher, "_wakeup", asyncio.Event())
+
+    async with app.router.lifespan_context(app):
+        client = get_ws_client()
+        assert get_ws_client() is client
+        assert not client.is_closed
+
+    assert client.is_closed
+    assert get_ws_client() is not client
+    await close_ws_client()
+
+
+def make_dispatcher(session: AsyncSession, responses: list[int]) -> tuple[LiveStatusDispatcher, list]:
+    """Dispatcher on the test session whose ws-backend answers with ``responses`` in order."""
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return httpx.Response(responses.pop(0) if responses else 200)
+
+    @asynccontextmanager
+    async def session_factory():
+        yield session
+
+    client = httpx.AsyncClient(base_url="http://ws-backend", transport=httpx.MockTransport(handler))
+    dispatcher = LiveStatusDispatcher(
+        session_factory=session_factory, client_factory=lambda: client, window=0, max_retries=2, retry_backoff=0
+    )
+    return dispatcher, sent
+
+
+async def outbox_size(session: AsyncSession) -> int:
+    result = await session.execute(select(func.count()).select_from(OutboxEvent))
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_relay_coalesces_and_drains_outbox(session: AsyncSession):
+    room, objective, users, activities = await create_room_with_members(session, 2)
+    dispatcher, sent = make_dispatcher(session, [])
+    start_time = datetime.now(UTC)
+
+    add_live_status_event(session, users[0].id, activities[0].id, True, start_time)
+    add_live_status_event(session, users[1].id, activities[1].id, True, start_time)
+    add_live_status_event(session, users[0].id, activities[0].id, False)
+    await session.commit()
+
+    await dispatcher.flush()
+
+    assert len(sent) == 1
+    updates = httpx.Response(200, content=sent[0].content).json()
+    room_updates = {u["userId"]: u for u in updates if u["roomId"]}
+    assert room_updates.keys() == {str(users[0].id), str(users[1].id)}
+    assert room_updates[str(users[0].id)]["live"] is False
+    assert room_updates[str(users[1].id)] == {
+        "userId": str(users[1].id),
+        "roomId": str(room.id),
+        "objectiveId": str(objective.id),
+        "live": True,
+        "startTime": start_time.isoformat(),
+    }
+    assert len([u for u in updates if u["roomId"] is None]) == 2
+    assert dispatcher.stats()["last_batch_size"] == 3
+    assert await outbox_size(session) == 0
+
+
+@pytest.mark.asyncio
+async def test_relay_splits_switch_into_stop_and_start(session: AsyncSession):
+    room, _, users, activities = await create_room_with_members(session, 1)
+    dispatcher, sent = make_dispatcher(session, [])
+    start_time = datetime.now(UTC)
+
+    add_live_status_event(session, users[0].id, uuid4(), True, start_time, previous_activity_id=activities[0].id)
+    await session.commit()
+
+    await dispatcher.flush()
+
+    updates = httpx.Response(200, content=sent[0].content).json()
+    assert [(u["roomId"], u["live"]) for u in updates] == [(str(room.id), False), (None, True)]
+    assert updates[1]["startTime"] == start_time.isoformat()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_relays_keep_events_of_a_user_in_order(session: AsyncSession, monkeypatch: pytest.MonkeyPatch):
+    user_id, activity_id = uuid4(), uuid4()
+    add_live_status_event(session, user_id, activity_id, True, datetime.now(UTC))
+    add_live_status_event(session, user_id, activity_id, False)
+    await session.commit()
+    start, stop = (await session.execute(select(OutboxEvent).order_by(OutboxEvent.id))).scalars().all()[-2:]
+
+    sent = []
+    posting, release = asyncio.Event(), asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(httpx.Response(200, content=request.content).json())
+        if len(sent) == 1:
+            posting.set()
+            await release.wait()
+        return httpx.Response(200)
+
+    @asynccontextmanager
+    async def session_factory():
+        yield session
+
+    client = httpx.AsyncClient(base_url="http://ws-backend", transport=httpx.MockTransport(handler))
+    first, second = (
+        LiveStatusDispatcher(session_factory=session_factory, client_factory=lambda: client, window=0) for _ in range(2)
+    )
+
+    # SQLite has no row locks: emulate FOR UPDATE SKIP LOCKED handing each relay one of the events
+    async def claim_start(_):
+        return [start]
+
+    async def claim_stop(_):
+        return [stop]
+
+    monkeypatch.setattr(first, "_claim", claim_start)
+    monkeypatch.setattr(second, "_claim", claim_stop)
+
+    first_relay = asyncio.create_task(first.relay_batch())
+    await posting.wait()
+    assert await second.relay_batch() == 0  # the start is still being delivered
+    release.set()
+    assert await first_relay == 1
+
+    monkeypatch.setattr(second, "_claim", LiveStatusDispatcher._claim.__get__(second))
+    assert await second.relay_batch() == 1
+    assert [[u["live"] for u in updates] for updates in sent] == [[True], [False]]
+    assert await outbox_size(session) == 0
+
+
+@pytest.mark.asyncio
+async def test_relay_retries_and_keeps_undelivered_events(session: AsyncSession):
+    dispatcher, sent = make_dispatcher(session, [503, 200, 503, 503, 503])
+
+    add_live_status_event(session, uuid4(), uuid4(), False)
+    await session.commit()
+    await dispatcher.flush()
+    assert len(sent) == 2
+    assert dispatcher.stats()["batches_sent"] == 1
+
+    add_live_status_event(session, uuid4(), uuid4(), False)
+    await session.commit()
+    await dispatcher.flush()
+    assert len(sent) == 5
+    assert dispatcher.stats()["retries"] == 3
+    assert dispatcher.stats()["batches_failed"] == 1
+    assert await outbox_size(session) == 1
+
+
+@pytest.mark.asyncio
+async def test_tracker_writes_outbox_in_its_transaction(client, token_headers: dict[str, str], session: AsyncSession):
+    response = await client.post(
+        "/api/v1/activities",
+        headers=token_headers,
+        json={"name": "Outbox", "emoji": "📮", "color": "#000", "resolution": "day"},
+    )
+    activity_id = response.json()["id"]
+    before = await outbox_size(session)
+
+    await client.post("/api/v1/activities/active", headers=token_headers, json={"activity_id": activity_id})
+    await client.delete("/api/v1/activities/active", headers=token_headers)
+
+    result = await session.execute(select(OutboxEvent.payload).order_by(OutboxEvent.id.desc()).limit(2))
+    assert [(p["activity_id"], p["active"]) for p in result.scalars()] == [(activity_id, False), (activity_id, True)]
+    assert await outbox_size(session) == before + 2
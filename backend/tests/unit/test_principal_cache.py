@@ -0,0 +1,63 @@
+import time
+from uuid import UUID
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies.auth import principal_cache
+from app.core.cache import TTLCache
+from tests.unit.test_stats_service import QueryCounter
+
+
+def test_ttl_cache_expires_and_evicts(monkeypatch: pytest.MonkeyPatch):
+    cache = TTLCache(ttl=10, maxsize=2)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None  # evicted
+    assert cache.get("b") == 2
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 2}
+
+
+@pytest.mark.asyncio
+async def test_cached_principal_skips_user_query(
+    client: AsyncClient, token_headers: dict[str, str], session: AsyncSession
+):
+    response = await client.get("/api/v1/users/me", headers=token_headers)
+    assert response.status_code == 200
+    hits = principal_cache.hits
+
+    async with QueryCounter(session) as counter:
+        cached_response = await client.get("/api/v1/users/me", headers=token_headers)
+
+    assert cached_response.json() == response.json()
+    assert principal_cache.hits == hits + 1
+    assert counter.count == 1  # only the settings
+
+
+@pytest.mark.asyncio
+async def test_password_change_invalidates_principal(client: AsyncClient, token_headers: dict[str, str]):
+    user_id = UUID((await client.get("/api/v1/users/me", headers=token_headers)).json()["id"])
+    assert principal_cache.get(user_id) is not None
+
+    response = await client.patch(
+        "/api/v1/users/me/password",
+        headers=token_headers,
+        json={"old_password": "testpassword", "new_password": "newpassword"},
+    )
+    assert response.status_code == 204
+    assert principal_cache.get(user_id) is None
+
+    response = await client.patch(
+        "/api/v1/users/me/password",
+        headers=token_headers,
+        json={"old_password": "testpassword", "new_password": "otherpassword"},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,97 @@
+import asyncio
+from uuid import uuid4
+
+import asyncpg
+import pytest
+
+from app.api.dependencies.auth import principal_cache
+from app.database.pubsub import RESET, ChangeListener, change_listener
+from app.services.room_service import RoomAccess, room_access_cache
+
+
+def test_dispatch_routes_changes_by_table():
+    listener = ChangeListener()
+    reactions, trackers = [], []
+    listener.subscribe("reactions", reactions.append)
+    listener.subscribe("active_activities", trackers.append)
+
+    change = {"table": "reactions", "op": "INSERT", "room_id": str(uuid4())}
+    listener._on_notification(None, 0, listener.channel, '{"table": "reactions", "op": "INSERT"}')
+    listener.dispatch(change)
+
+    assert reactions == [{"table": "reactions", "op": "INSERT"}, change]
+    assert trackers == []
+    assert listener.stats()["received"] == 1
+
+
+def test_failing_subscriber_does_not_stop_others():
+    listener = ChangeListener()
+    received = []
+    listener.subscribe("users", lambda _: 1 / 0)
+    listener.subscribe("users", received.append)
+
+    listener.dispatch(RESET)
+
+    assert received == [RESET]
+
+
+def test_changes_invalidate_caches_of_this_worker():
+    user_id, room_id, other_room_id = uuid4(), uuid4(), uuid4()
+    principal_cache.set(user_id, {"id": user_id})
+    room_access_cache.set(room_id, RoomAccess(user_id, frozenset({user_id})))
+    room_access_cache.set(other_room_id, RoomAccess(user_id, frozenset({user_id})))
+
+    change_listener.dispatch({"table": "users", "op": "UPDATE", "id": str(user_id)})
+    change_listener.dispatch({"table": "room_members", "op": "DELETE", "room_id": str(room_id), "user_id": "x"})
+
+    assert principal_cache.get(user_id) is None
+    assert room_access_cache.get(room_id) is None
+    assert room_access_cache.get(other_room_id) is not None
+
+    change_listener.dispatch({"table": "rooms", "op": "DELETE", "id": str(other_room_id)})
+    assert room_access_cache.get(other_room_id) is None
+
+
+class FakeConnection:
+    def __init__(self, listen_error: Exception | None = None):
+        self.listen_error = listen_error
+        self.closed = False
+
+    def add_termination_listener(self, callback) -> None:
+        pass
+
+    async def add_listener(self, channel: str, callback) -> None:
+        if self.listen_error:
+            raise self.listen_error
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_listener_reconnects_after_any_error(monkeypatch: pytest.MonkeyPatch):
+    broken = FakeConnection(asyncpg.InterfaceError("connection is closed"))
+    connections = [broken, FakeConnection()]
+
+    async def connect(**kwargs):
+        return connections.pop(0)
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    listener = ChangeListener(retry_backoff=0)
+    resets = []
+    listener.subscribe("users", resets.append)
+
+    listener.start()
+    try:
+        async with asyncio.timeout(1):
+            while not resets:
+                await asyncio.sleep(0)
+    finally:
+        await listener.stop()
+
+    assert resets == [RESET]
+    assert broken.closed
+    assert connections == []
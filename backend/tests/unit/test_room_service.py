@@ -7,7 +7,7 @@ from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schema.room import RoomCreate
-from app.models.room import Room, RoomMember
+from app.models.room import Room
 from app.models.user import ResolutionEnum, UserSettings
 from app.services.room_service import create_room, join_room, verify_room_admin
 
@@ -20,6 +20,12 @@ def mock_session() -> AsyncMock:
     return session
 
 
+def access_rows(admin_id, *member_ids) -> MagicMock:
+    """Result of the room access query: one (admin_id, user_id) row per member."""
+    rows = [MagicMock(admin_id=admin_id, user_id=member_id) for member_id in (admin_id, *member_ids)]
+    return MagicMock(all=MagicMock(return_value=rows))
+
+
 @pytest.mark.asyncio
 class TestRoomService:
     """Unit tests for the room service."""
@@ -37,11 +43,12 @@ class TestRoomService:
         assert result is not None
         assert result.name == room_data.name
         assert result.admin_id == user_id
-        # Expecting 2 adds: Room and RoomMember
-        assert mock_session.add.call_count == 2
+        # Expecting 2 adds: Room, then RoomMember saved with the commit
+        mock_session.add.assert_called_once()
+        mock_session.add_all.assert_called_once()
         mock_session.flush.assert_awaited_once()
         mock_session.commit.assert_awaited_once()
-        mock_session.refresh.assert_awaited_once()
+        mock_session.refresh.assert_not_awaited()
 
     async def test_create_room_limit_reached(self, mock_session: AsyncMock):
         """Test that a user cannot create more than 100 rooms."""
@@ -67,11 +74,11 @@ class TestRoomService:
         mock_user_settings = UserSettings(user_id=user_id, resolution=ResolutionEnum.DAY)
 
         # 1. get_room
-        # 2. check if already member
+        # 2. room access, to check if already member
         # 3. get user settings
         mock_session.execute.side_effect = [
             MagicMock(scalar_one_or_none=MagicMock(return_value=mock_room)),
-            MagicMock(scalar_one_or_none=MagicMock(return_value=None)),  # Not a member
+            access_rows(uuid4()),  # Not a member
             MagicMock(scalar_one_or_none=MagicMock(return_value=mock_user_settings)),
         ]
 
@@ -91,10 +98,10 @@ class TestRoomService:
         # Mocks
         mock_room = Room(id=room_id, resolution=ResolutionEnum.WEEK)
         # 1. get_room
-        # 2. check if already member
+        # 2. room access, to check if already member
         mock_session.execute.side_effect = [
             MagicMock(scalar_one_or_none=MagicMock(return_value=mock_room)),
-            MagicMock(scalar_one_or_none=MagicMock(return_value=RoomMember(user_id=user_id, room_id=room_id))),
+            access_rows(uuid4(), user_id),
         ]
 
         with pytest.raises(HTTPException) as exc_info:
@@ -113,11 +120,11 @@ class TestRoomService:
         mock_user_settings = UserSettings(user_id=user_id, resolution=ResolutionEnum.WEEK)  # User is weekly
 
         # 1. get_room
-        # 2. check if already member
+        # 2. room access, to check if already member
         # 3. get user settings
         mock_session.execute.side_effect = [
             MagicMock(scalar_one_or_none=MagicMock(return_value=mock_room)),
-            MagicMock(scalar_one_or_none=MagicMock(return_value=None)),  # Not a member
+            access_rows(uuid4()),  # Not a member
             MagicMock(scalar_one_or_none=MagicMock(return_value=mock_user_settings)),
         ]
 
@@ -132,14 +139,16 @@ class TestRoomService:
         user_id = uuid4()
         room_id = uuid4()
 
-        mock_room = Room(id=room_id, admin_id=user_id)
-        mock_session.execute.return_value.scalar_one_or_none.return_value = mock_room
+        mock_session.execute.return_value = access_rows(user_id)
+
+        access = await verify_room_admin(mock_session, room_id, user_id)
 
-        room = await verify_room_admin(mock_session, room_id, user_id)
+        assert access is not None
+        assert access.admin_id == user_id
 
-        assert room is not None
-        assert room.id == room_id
-        assert room.admin_id == user_id
+        # the second check is served from the cache
+        await verify_room_admin(mock_session, room_id, user_id)
+        mock_session.execute.assert_awaited_once()
 
     async def test_verify_room_admin_not_admin(self, mock_session: AsyncMock):
         """Test that a non-admin is rejected."""
@@ -147,8 +156,7 @@ class TestRoomService:
         admin_id = uuid4()
         room_id = uuid4()
 
-        mock_room = Room(id=room_id, admin_id=admin_id)  # Different admin
-        mock_session.execute.return_value.scalar_one_or_none.return_value = mock_room
+        mock_session.execute.return_value = access_rows(admin_id, user_id)  # Different admin
 
         with pytest.raises(HTTPException) as exc_info:
             await verify_room_admin(mock_session, room_id, user_id)
@@ -161,7 +169,7 @@ class TestRoomService:
         user_id = uuid4()
         room_id = uuid4()
 
-        mock_session.execute.return_value.scalar_one_or_none.return_value = None
+        mock_session.execute.return_value.all.return_value = []
 
         with pytest.raises(HTTPException) as exc_info:
             await verify_room_admin(mock_session, room_id, user_id)
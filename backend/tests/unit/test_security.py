@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+from argon2 import PasswordHasher
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import security
+from app.core.security import get_password_hash, get_password_hash_async, verify_password_async
+from app.models.user import User
+from app.services.auth_service import authenticate_user
+
+
+@pytest.mark.asyncio
+async def test_async_hashing_round_trip():
+    hashes = await asyncio.gather(*(get_password_hash_async(f"secret-{i}") for i in range(4)))
+
+    assert await verify_password_async("secret-0", hashes[0]) is True
+    assert await verify_password_async("secret-1", hashes[0]) is False
+    assert security._hashing_stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password(session: AsyncSession):
+    old_hasher = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1)
+    user = User(email="rehash@example.com", password_hash=old_hasher.hash("secret"), full_name="Rehash")
+    session.add(user)
+    await session.commit()
+
+    assert await authenticate_user(session, "rehash@example.com", "secret") is user
+    assert not security.password_needs_rehash(user.password_hash)
+    assert await verify_password_async("secret", user.password_hash)
+
+
+@pytest.mark.asyncio
+async def test_login_keeps_current_hash(session: AsyncSession):
+    password_hash = get_password_hash("secret")
+    user = User(email="current@example.com", password_hash=password_hash, full_name="Current")
+    session.add(user)
+    await session.commit()
+
+    assert await authenticate_user(session, "current@example.com", "secret") is user
+    assert user.password_hash == password_hash
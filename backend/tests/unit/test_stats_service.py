@@ -1,7 +1,263 @@
+from datetime import UTC, date, datetime
+from uuid import uuid4
+
 import pytest
+from sqlalchemy import event, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.periods import period_start, truncate_date
+from app.models.active_activity import ActiveActivity
+from app.models.activity import Activity, ActivityLog
+from app.models.mapping import ActivityObjectiveMapping
+from app.models.room import Objective, Room, RoomMember
+from app.models.user import ResolutionEnum, User, UserSettings
+from app.services.rollup_service import add_logged_minutes
+from app.services.statistics_service import (
+    get_participant_stats,
+    get_personal_period_stats,
+    get_personal_stats,
+    get_room_period_stats,
+)
 
 
 @pytest.mark.asyncio
 async def test_stats_aggregation():
     # Placeholder for stats logic tests
     assert True
+
+
+class QueryCounter:
+    """Counts statements executed on the connection behind a session."""
+
+    def __init__(self, session: AsyncSession):
+        self.count = 0
+        self._sync_conn = None
+        self._session = session
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    async def __aenter__(self):
+        connection = await self._session.connection()
+        self._sync_conn = connection.sync_connection
+        event.listen(self._sync_conn, "before_cursor_execute", self._on_execute)
+        return self
+
+    async def __aexit__(self, *exc):
+        event.remove(self._sync_conn, "before_cursor_execute", self._on_execute)
+
+
+async def add_logs(session: AsyncSession, activity_id, logs: list[tuple[date, int]]) -> None:
+    """Adds raw logs together with their daily rollup, as the log writers do."""
+    for day, minutes in logs:
+        session.add(ActivityLog(activity_id=activity_id, timestamp=day, duration_minutes=minutes))
+    await add_logged_minutes(session, [(activity_id, day, minutes) for day, minutes in logs])
+
+
+async def create_room_with_members(
+    session: AsyncSession, member_count: int
+) -> tuple[Room, Objective, list[User], list[Activity]]:
+    admin = User(email=f"admin_{uuid4()}@example.com", password_hash="x", full_name="Admin")
+    session.add(admin)
+    await session.flush()
+
+    room = Room(admin_id=admin.id, name="Stats Room", resolution="day")
+    session.add(room)
+    await session.flush()
+
+    objective = Objective(room_id=room.id, name="Focus", emoji="🎯", color="#000")
+    session.add(objective)
+
+    users = [admin]
+    activities = []
+    for i in range(member_count - 1):
+        user = User(email=f"member_{uuid4()}@example.com", password_hash="x", full_name=f"Member {i}")
+        session.add(user)
+        users.append(user)
+    await session.flush()
+
+    for user in users:
+        session.add(RoomMember(room_id=room.id, user_id=user.id))
+        activity = Activity(user_id=user.id, name="Work", emoji="💼", color="#111", resolution="day")
+        session.add(activity)
+        activities.append(activity)
+        await session.flush()
+        session.add(
+            ActivityObjectiveMapping(
+                room_id=room.id, user_id=user.id, activity_id=activity.id, objective_id=objective.id, weight=0.5
+            )
+        )
+        await add_logs(session, activity.id, [(date(2025, 1, 10), 40), (date(2025, 2, 10), 20)])
+
+    await session.commit()
+    return room, objective, users, activities
+
+
+@pytest.mark.asyncio
+class TestParticipantStats:
+    async def test_participant_stats_shape(self, session: AsyncSession):
+        """Test that mapped time is weighted and live trackers are reported."""
+        room, objective, users, activities = await create_room_with_members(session, 2)
+        start_time = datetime(2025, 3, 1, 12, 0, tzinfo=UTC)
+        session.add(ActiveActivity(user_id=users[1].id, activity_id=activities[1].id, start_time=start_time))
+        await session.commit()
+
+        stats = await get_participant_stats(session, room.id)
+
+        stats_by_user = {s["user_id"]: s for s in stats}
+        assert stats_by_user.keys() == {u.id for u in users}
+        for s in stats:
+            assert s["objectives"][0]["objective_id"] == objective.id
+            assert s["objectives"][0]["minutes"] == 30
+
+        assert "is_live" not in stats_by_user[users[0].id]["objectives"][0]
+        live_stats = stats_by_user[users[1].id]
+        assert live_stats["objectives"][0]["is_live"] is True
+        assert live_stats["live_activities"][0]["objective_id"] == str(objective.id)
+
+    async def test_participant_stats_date_filter(self, session: AsyncSession):
+        """Test that the date range only counts logs inside it."""
+        room, _, _, _ = await create_room_with_members(session, 1)
+
+        stats = await get_participant_stats(session, room.id, start_date=date(2025, 2, 1))
+
+        assert stats[0]["objectives"][0]["minutes"] == 10
+
+    async def test_member_without_mappings(self, session: AsyncSession):
+        """Test that members with no mappings are still listed."""
+        room, _, _, _ = await create_room_with_members(session, 1)
+        lurker = User(email=f"lurker_{uuid4()}@example.com", password_hash="x", full_name="Lurker")
+        session.add(lurker)
+        await session.flush()
+        session.add(RoomMember(room_id=room.id, user_id=lurker.id))
+        await session.commit()
+
+        stats = await get_participant_stats(session, room.id)
+
+        lurker_stats = next(s for s in stats if s["user_id"] == lurker.id)
+        assert lurker_stats["objectives"] == []
+        assert lurker_stats["live_activities"] == []
+
+    async def test_query_count_does_not_depend_on_room_size(self, session: AsyncSession):
+        """Test that computing stats for a bigger room costs the same number of queries."""
+        small_room, _, _, _ = await create_room_with_members(session, 2)
+        big_room, _, _, _ = await create_room_with_members(session, 10)
+
+        async with QueryCounter(session) as small_counter:
+            await get_participant_stats(session, small_room.id)
+        async with QueryCounter(session) as big_counter:
+            big_stats = await get_participant_stats(session, big_room.id)
+
+        assert small_counter.count == big_counter.count
+        assert len(big_stats) == 10
+
+
+@pytest.mark.asyncio
+class TestPersonalStats:
+    @pytest.fixture
+    async def user(self, session: AsyncSession) -> User:
+        user = User(email=f"personal_{uuid4()}@example.com", password_hash="x", full_name="Personal")
+        session.add(user)
+        await session.flush()
+        return user
+
+    async def test_personal_stats_totals_and_live(self, session: AsyncSession, user: User):
+        """Test totals per activity, skipping empty ones unless they are live."""
+        logged = Activity(user_id=user.id, name="Logged", emoji="📝", color="#111", resolution="day")
+        empty = Activity(user_id=user.id, name="Empty", emoji="🫙", color="#222", resolution="day")
+        live = Activity(user_id=user.id, name="Live", emoji="🔴", color="#333", resolution="day")
+        session.add_all([logged, empty, live])
+        await session.flush()
+        await add_logs(session, logged.id, [(date(2025, 1, 10), 25), (date(2025, 1, 11), 35)])
+        session.add(ActiveActivity(user_id=user.id, activity_id=live.id, start_time=datetime.now(UTC)))
+        await session.commit()
+
+        async with QueryCounter(session) as counter:
+            stats = await get_personal_stats(session, user.id)
+
+        assert counter.count == 1
+        stats_by_name = {s["name"]: s for s in stats}
+        assert stats_by_name.keys() == {"Logged", "Live"}
+        assert stats_by_name["Logged"]["value"] == 60
+        assert stats_by_name["Logged"]["is_live"] is False
+        assert stats_by_name["Live"]["value"] == 0
+        assert stats_by_name["Live"]["is_live"] is True
+        assert "start_time" in stats_by_name["Live"]
+
+    async def test_personal_stats_date_filter(self, session: AsyncSession, user: User):
+        """Test that only logs inside the date range are summed."""
+        activity = Activity(user_id=user.id, name="Reading", emoji="📚", color="#111", resolution="day")
+        session.add(activity)
+        await session.flush()
+        await add_logs(session, activity.id, [(date(2025, 1, 10), 25), (date(2025, 2, 10), 35)])
+        await session.commit()
+
+        stats = await get_personal_stats(session, user.id, start_date=date(2025, 1, 1), end_date=date(2025, 1, 31))
+        assert stats[0]["value"] == 25
+
+        stats = await get_personal_stats(session, user.id, start_date=date(2025, 3, 1))
+        assert stats == []
+
+
+@pytest.mark.asyncio
+class TestPeriodStats:
+    @pytest.mark.parametrize(
+        ("resolution", "expected"),
+        [
+            (ResolutionEnum.DAY, date(2025, 1, 15)),
+            (ResolutionEnum.WEEK, date(2025, 1, 13)),
+            (ResolutionEnum.MONTH, date(2025, 1, 1)),
+            (ResolutionEnum.YEAR, date(2025, 1, 1)),
+        ],
+    )
+    async def test_period_start_matches_truncate_date(self, session: AsyncSession, resolution, expected):
+        """Test that the SQL bucket expression agrees with the Python one."""
+        day = date(2025, 1, 15)  # a Wednesday
+
+        result = await session.execute(select(period_start(literal(day), resolution)))
+
+        assert result.scalar_one() == expected
+        assert truncate_date(day, resolution) == expected
+
+    async def test_week_starting_on_monday_stays_in_its_week(self, session: AsyncSession):
+        """Test that a Monday is the start of its own week, not the previous one."""
+        monday = date(2025, 1, 13)
+        result = await session.execute(select(period_start(literal(monday), ResolutionEnum.WEEK)))
+        assert result.scalar_one() == monday
+
+    async def test_personal_period_stats_use_user_resolution(self, session: AsyncSession):
+        """Test that personal buckets default to the user's resolution setting."""
+        user = User(email=f"periods_{uuid4()}@example.com", password_hash="x", full_name="Periods")
+        session.add(user)
+        await session.flush()
+        session.add(UserSettings(user_id=user.id, resolution=ResolutionEnum.MONTH))
+        activity = Activity(user_id=user.id, name="Reading", emoji="📚", color="#111", resolution="day")
+        session.add(activity)
+        await session.flush()
+        await add_logs(session, activity.id, [(date(2025, 1, 10), 25), (date(2025, 1, 20), 35), (date(2025, 2, 3), 15)])
+        await session.commit()
+
+        stats = await get_personal_period_stats(session, user.id)
+
+        assert stats["resolution"] == ResolutionEnum.MONTH
+        assert [(p["period_start"], p["minutes"]) for p in stats["periods"]] == [
+            (date(2025, 1, 1), 60),
+            (date(2025, 2, 1), 15),
+        ]
+
+        stats = await get_personal_period_stats(session, user.id, ResolutionEnum.YEAR, end_date=date(2025, 1, 31))
+        assert [(p["period_start"], p["minutes"]) for p in stats["periods"]] == [(date(2025, 1, 1), 60)]
+
+    async def test_room_period_stats_use_room_resolution(self, session: AsyncSession):
+        """Test that room buckets follow the room's resolution and apply mapping weights."""
+        room, objective, users, _ = await create_room_with_members(session, 2)
+        room.resolution = ResolutionEnum.MONTH
+        await session.commit()
+
+        stats = await get_room_period_stats(session, room.id)
+
+        assert stats["resolution"] == ResolutionEnum.MONTH
+        assert len(stats["periods"]) == 4
+        january = [p for p in stats["periods"] if p["period_start"] == date(2025, 1, 1)]
+        assert {p["user_id"] for p in january} == {u.id for u in users}
+        assert all(p["objective_id"] == objective.id and p["minutes"] == 20 for p in january)
@@ -1,5 +1,5 @@
 from datetime import UTC, date, datetime, timedelta
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
@@ -7,7 +7,6 @@ from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.active_activity import ActiveActivity
-from app.models.activity import Activity
 from app.services.tracker_service import (
     get_active_activity,
     start_activity,
@@ -27,7 +26,7 @@ def mock_session():
 @pytest.fixture
 def mock_notify():
     """Mocks the notification service."""
-    with patch("app.services.tracker_service.notify_live_status", new_callable=AsyncMock) as mock_notify:
+    with patch("app.services.tracker_service.add_live_status_event") as mock_notify:
         yield mock_notify
 
 
@@ -48,32 +47,32 @@ class TestTrackerService:
         assert result.user_id == user_id
         mock_session.execute.assert_called_once()
 
-    async def test_start_activity_success(self, mock_session: AsyncSession, mock_notify: AsyncMock):
+    async def test_start_activity_success(self, mock_session: AsyncSession, mock_notify: MagicMock):
         """Test starting a new activity successfully."""
         user_id = uuid4()
         activity_id = uuid4()
 
-        # Mock that the activity exists
-        mock_session.execute.side_effect = [
-            MagicMock(scalar_one_or_none=MagicMock(return_value=Activity(id=activity_id, user_id=user_id))),
-            MagicMock(scalar_one_or_none=MagicMock(return_value=None)),  # No existing active activity
-        ]
+        # the insert returns the new tracker
+        mock_session.scalar.return_value = ActiveActivity(
+            user_id=user_id, activity_id=activity_id, start_time=datetime.now(UTC)
+        )
 
         result = await start_activity(mock_session, user_id, activity_id)
 
         assert result is not None
         assert result.user_id == user_id
         assert result.activity_id == activity_id
-        mock_session.add.assert_called_once()
+        mock_session.scalar.assert_awaited_once()
         mock_session.commit.assert_awaited_once()
-        mock_notify.assert_awaited_once_with(mock_session, user_id, activity_id, True, result.start_time)
+        mock_notify.assert_called_once_with(mock_session, user_id, activity_id, True, result.start_time)
 
     async def test_start_activity_not_found(self, mock_session: AsyncSession):
         """Test starting an activity that does not exist."""
         user_id = uuid4()
         activity_id = uuid4()
 
-        # Mock that the activity does not exist
+        # Mock that nothing was inserted and the activity does not exist
+        mock_session.scalar.return_value = None
         mock_session.execute.return_value.scalar_one_or_none.return_value = None
 
         with pytest.raises(HTTPException) as exc_info:
@@ -87,32 +86,25 @@ class TestTrackerService:
         user_id = uuid4()
         activity_id = uuid4()
 
-        # Mock that activity exists and another is active
-        mock_session.execute.side_effect = [
-            MagicMock(
-                scalar_one_or_none=MagicMock(return_value=Activity(id=activity_id, user_id=user_id))
-            ),  # activity check
-            MagicMock(
-                scalar_one_or_none=MagicMock(return_value=ActiveActivity(user_id=user_id, activity_id=uuid4()))
-            ),  # active check
-        ]
+        # Mock that nothing was inserted although the activity exists
+        mock_session.scalar.return_value = None
+        mock_session.execute.return_value.scalar_one_or_none.return_value = activity_id
 
         with pytest.raises(HTTPException) as exc_info:
             await start_activity(mock_session, user_id, activity_id)
 
         assert exc_info.value.status_code == 400
         assert "already has an active activity" in exc_info.value.detail
+        mock_session.commit.assert_not_awaited()
 
-    async def test_stop_activity_success(self, mock_session: AsyncSession, mock_notify: AsyncMock):
+    async def test_stop_activity_success(self, mock_session: AsyncSession, mock_notify: MagicMock):
         """Test stopping an active activity."""
         user_id = uuid4()
         activity_id = uuid4()
         start_time = datetime.now(UTC) - timedelta(minutes=10)
 
-        # Mock active activity
-        mock_session.execute.return_value.scalar_one_or_none.return_value = ActiveActivity(
-            user_id=user_id, activity_id=activity_id, start_time=start_time
-        )
+        # the delete returns the running tracker
+        mock_session.execute.return_value.one_or_none.return_value = (activity_id, start_time)
 
         result = await stop_activity(mock_session, user_id)
 
@@ -120,58 +112,81 @@ class TestTrackerService:
         assert result.activity_id == activity_id
         assert result.duration_minutes == 10
         mock_session.add.assert_called_once()
-        mock_session.delete.assert_called_once()
         mock_session.commit.assert_awaited_once()
-        mock_notify.assert_awaited_once_with(mock_session, user_id, activity_id, False)
+        mock_notify.assert_called_once_with(mock_session, user_id, activity_id, False)
 
     async def test_stop_activity_none_active(self, mock_session: AsyncSession):
         """Test stopping when no activity is active."""
         user_id = uuid4()
-        mock_session.execute.return_value.scalar_one_or_none.return_value = None
+        mock_session.execute.return_value.one_or_none.return_value = None
 
         result = await stop_activity(mock_session, user_id)
         assert result is None
+        mock_session.execute.assert_awaited_once()
 
-    async def test_switch_activity_success(self, mock_session: AsyncSession, mock_notify: AsyncMock):
-        """Test switching from one activity to another."""
+    async def test_switch_activity_success(self, mock_session: AsyncSession, mock_notify: MagicMock):
+        """Test switching from one activity to another in a single transaction."""
         user_id = uuid4()
         old_activity_id = uuid4()
         new_activity_id = uuid4()
         start_time = datetime.now(UTC) - timedelta(minutes=5)
 
-        # Mock sequence of calls
-        mock_session.execute.side_effect = [
-            # 1. stop_activity: get_active_activity
-            MagicMock(
-                scalar_one_or_none=MagicMock(
-                    return_value=ActiveActivity(user_id=user_id, activity_id=old_activity_id, start_time=start_time)
-                )
-            ),
-            # 2. start_activity: check if new activity exists
-            MagicMock(scalar_one_or_none=MagicMock(return_value=Activity(id=new_activity_id, user_id=user_id))),
-            # 3. start_activity: get_active_activity (should be none after stop)
-            MagicMock(scalar_one_or_none=MagicMock(return_value=None)),
-        ]
+        # the delete returns the running tracker, the insert the new one
+        mock_session.execute.return_value.one_or_none.return_value = (old_activity_id, start_time)
+        mock_session.scalar.return_value = ActiveActivity(user_id=user_id, activity_id=new_activity_id)
 
         result = await switch_activity(mock_session, user_id, new_activity_id)
 
         assert result is not None
         assert result.activity_id == new_activity_id
 
-        assert mock_session.delete.call_count == 1
-        assert mock_session.add.call_count == 2  # 1 for log, 1 for new active
-        assert mock_session.commit.call_count == 2  # 1 in stop, 1 in start
-        assert mock_notify.call_count == 2
+        mock_session.add.assert_called_once()  # the log of the old activity
+        mock_session.commit.assert_awaited_once()
+        mock_notify.assert_called_once_with(mock_session, user_id, new_activity_id, True, ANY, old_activity_id)
+
+    async def test_switch_activity_not_found(self, mock_session: AsyncSession):
+        """Test that switching to an unknown activity logs nothing."""
+        mock_session.execute.return_value.one_or_none.return_value = (uuid4(), datetime.now(UTC))
+        mock_session.scalar.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            await switch_activity(mock_session, uuid4(), uuid4())
+
+        assert exc_info.value.status_code == 404
+        mock_session.add.assert_not_called()
+        mock_session.commit.assert_not_awaited()
+
+    async def test_switch_after_concurrent_switch_logs_its_tracker(
+        self, mock_session: AsyncSession, mock_notify: MagicMock
+    ):
+        """Test that a switch racing with another one logs the tracker the other switch started."""
+        user_id = uuid4()
+        raced_activity_id = uuid4()
+        new_activity_id = uuid4()
+        raced_start_time = datetime.now(UTC) - timedelta(minutes=3)
+
+        # the first delete finds nothing since the other switch replaced the row, so the insert conflicts;
+        # the second delete takes the tracker the other switch started
+        mock_session.execute.return_value.one_or_none.side_effect = [None, (raced_activity_id, raced_start_time)]
+        mock_session.execute.return_value.scalar_one_or_none.return_value = new_activity_id
+        mock_session.scalar.side_effect = [None, ActiveActivity(user_id=user_id, activity_id=new_activity_id)]
+
+        result = await switch_activity(mock_session, user_id, new_activity_id)
+
+        assert result.activity_id == new_activity_id
+        mock_session.add.assert_called_once()
+        assert mock_session.add.call_args.args[0].activity_id == raced_activity_id
+        assert mock_session.add.call_args.args[0].duration_minutes == 3
+        mock_notify.assert_called_once_with(mock_session, user_id, new_activity_id, True, ANY, raced_activity_id)
 
     async def test_stop_activity_handles_naive_datetime(self, mock_session, mock_notify):
         """Test that stop_activity correctly handles a naive datetime from the database."""
         user_id = uuid4()
         activity_id = uuid4()
         # Create a naive datetime, as if it came from a DB like SQLite
-        naive_start_time = datetime.now(UTC) - timedelta(minutes=30)
+        naive_start_time = datetime.now(UTC).replace(tzinfo=None) - timedelta(minutes=30)
 
-        mock_active_activity = ActiveActivity(user_id=user_id, activity_id=activity_id, start_time=naive_start_time)
-        mock_session.execute.return_value.scalar_one_or_none.return_value = mock_active_activity
+        mock_session.execute.return_value.one_or_none.return_value = (activity_id, naive_start_time)
 
         log = await stop_activity(mock_session, user_id)
 
@@ -186,6 +201,16 @@ class TestTrackerService:
 
         # Verify other calls
         mock_session.add.assert_called_once()
-        mock_session.delete.assert_called_once()
         mock_session.commit.assert_awaited_once()
-        mock_notify.assert_awaited_once_with(mock_session, user_id, activity_id, False)
+        mock_notify.assert_called_once_with(mock_session, user_id, activity_id, False)
+
+    async def test_stop_activity_locks_activity_before_rooms(self, mock_session, mock_notify):
+        """Test that logging takes the activity lock before the room lock, like mapping changes do."""
+        mock_session.execute.return_value.one_or_none.return_value = (uuid4(), datetime.now(UTC))
+
+        await stop_activity(mock_session, uuid4())
+
+        statements = [str(call.args[0]) for call in mock_session.execute.call_args_list]
+        activity_lock = next(i for i, sql in enumerate(statements) if "FROM activities" in sql and "FOR UPDATE" in sql)
+        room_bump = next(i for i, sql in enumerate(statements) if sql.startswith("UPDATE rooms"))
+        assert activity_lock < room_bump